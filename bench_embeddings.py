@@ -0,0 +1,6 @@
+import sys
+from rag_search.cli import main
+
+# Same as `rag-search bench embeddings`
+if __name__ == "__main__":
+    sys.exit(main(["bench", "embeddings"]))
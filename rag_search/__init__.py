@@ -0,0 +1,2 @@
+# Minimal RAG over Azure AI Search. Submodules are imported on demand by the CLI
+# so that startup does not pay for the Azure and OpenAI SDKs.
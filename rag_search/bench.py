@@ -0,0 +1,204 @@
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from .embedding_store import EMBEDDING_DIMENSIONS, VectorStore, decode_embedding
+
+# Cold start of the CLI (interpreter + parsing the command line) must stay under this budget
+DEFAULT_STARTUP_BUDGET_MS = 300
+# Modules the CLI must not import before a subcommand needs them
+HEAVY_MODULES = ("openai", "azure", "numpy", "httpx", "pydantic")
+
+
+def _time_python(code, runs):
+    samples = []
+    output = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout.strip()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), output
+
+
+# Measure the CLI's cold start, up to the chat prompt, in fresh interpreters and check it against the budget.
+# Returns a non-zero exit code if it is over budget or imports an SDK eagerly.
+def bench_startup(runs=5):
+    budget_ms = float(os.getenv("STARTUP_BUDGET_MS", DEFAULT_STARTUP_BUDGET_MS))
+    interpreter_ms, _ = _time_python("pass", runs)
+    # Everything `rag-search chat` imports before it shows the prompt
+    cli_ms, loaded = _time_python(
+        "import sys; from rag_search.cli import build_parser; build_parser().parse_args(['chat']); "
+        "import rag_search.config, rag_search.conversation; "
+        f"print(','.join(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY_MODULES!r}))))",
+        runs,
+    )
+    sdk_ms, _ = _time_python("import openai, azure.search.documents, numpy", runs)
+    print(f"Interpreter startup:        {interpreter_ms:8.1f} ms")
+    print(f"CLI cold start:             {cli_ms:8.1f} ms (budget {budget_ms:.0f} ms)")
+    print(f"Eager SDK imports, for ref: {sdk_ms:8.1f} ms")
+    if loaded:
+        print(f"Heavy modules imported at startup: {loaded}")
+        return 1
+    if cli_ms > budget_ms:
+        print("Cold start is over budget.")
+        return 1
+    return 0
+
+
+# Parse time and memory of embedding responses returned as JSON float lists versus
+# base64 float32, and the cost of serializing them for upload. Runs offline on
+# synthetic vectors, no Azure resources required.
+def bench_embeddings(num_vectors=1000, repeats=3):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_vectors, EMBEDDING_DIMENSIONS)).astype(np.float32)
+
+    float_body = json.dumps(
+        {"data": [{"index": i, "embedding": [float(x) for x in v]} for i, v in enumerate(vectors)]}
+    )
+    base64_body = json.dumps(
+        {"data": [{"index": i, "embedding": base64.b64encode(v.tobytes()).decode("ascii")} for i, v in enumerate(vectors)]}
+    )
+
+    def parse_float_lists():
+        return [item["embedding"] for item in json.loads(float_body)["data"]]
+
+    def parse_base64():
+        store = VectorStore(capacity=num_vectors)
+        for item in json.loads(base64_body)["data"]:
+            store.extend(decode_embedding(item["embedding"]))
+        return store
+
+    def serialize_float_lists(parsed):
+        return json.dumps([{"vector": v} for v in parsed])
+
+    def serialize_store(store):
+        return json.dumps([{"vector": store[row].tolist()} for row in range(len(store))])
+
+    def measure(fn, *args):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn(*args)
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        result = fn(*args)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return result, best, retained, peak
+
+    print(f"{num_vectors} vectors x {EMBEDDING_DIMENSIONS} dimensions")
+    print(f"Response size: float lists {len(float_body) / 2**20:.1f} MiB, base64 {len(base64_body) / 2**20:.1f} MiB")
+    print(f"{'approach':<22}{'parse s':>10}{'retained MiB':>15}{'peak MiB':>12}{'serialize s':>14}")
+    for name, parse, serialize in (
+        ("json float lists", parse_float_lists, serialize_float_lists),
+        ("base64 + float32", parse_base64, serialize_store),
+    ):
+        parsed, seconds, retained, peak = measure(parse)
+        _, serialize_seconds, _, _ = measure(serialize, parsed)
+        print(f"{name:<22}{seconds:>10.3f}{retained / 2**20:>15.1f}{peak / 2**20:>12.1f}{serialize_seconds:>14.3f}")
+    return 0
+
+
+# Recall of postfiltering a vector search to one partition, as the corpus is split
+# into more partitions. An offline simulation on synthetic vectors with exact search:
+# prefilter searches only the partition's vectors, postfilter takes the global top
+# `candidates` (as the index's k) and drops other partitions. Recall is the share of
+# the true in-partition top_k that postfiltering still returns. It says nothing about
+# latency, which depends on the service's HNSW index; see bench_filters_live().
+def bench_filters(num_vectors=20000, partition_counts=(1, 4, 16, 64, 256), queries=50, top_k=3, candidates=50, dimensions=256):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_vectors, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors = vectors[rng.choice(num_vectors, queries, replace=False)] + 0.5 * rng.standard_normal(
+        (queries, dimensions)
+    ).astype(np.float32)
+
+    def top(scores, k):
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        return best[np.argsort(-scores[best])]
+
+    print(f"Simulated recall: {num_vectors} vectors x {dimensions} dimensions, top {top_k}, postfilter k={candidates}")
+    print(f"{'partitions':>10}{'postfilter recall':>19}{'empty results':>15}")
+    for count in partition_counts:
+        partitions = rng.integers(0, count, num_vectors)
+        members = [np.flatnonzero(partitions == p) for p in range(count)]
+        recall = []
+        empty = 0
+        for q, query in enumerate(query_vectors):
+            rows = members[q % count]
+            expected = rows[top(vectors[rows] @ query, top_k)]
+            found = top(vectors @ query, candidates)
+            found = found[partitions[found] == q % count][:top_k]
+            recall.append(len(np.intersect1d(found, expected)) / len(expected))
+            empty += not len(found)
+        print(f"{count:>10}{statistics.mean(recall):>19.2f}{empty:>15}")
+    return 0
+
+
+# Latency and recall of preFilter versus postFilter vector searches on a real index,
+# for each partition value found in it (load partitions with `ingest --partition`).
+# Each query is the stored vector of one of the partition's documents, searched through
+# chat._search() (HNSW, k = top_k) in both modes; recall is the share of an exhaustive
+# prefiltered search's top_k that each mode returns. Runs `queries` searches per mode
+# and partition against the index, without any embedding calls.
+def bench_filters_live(index_name=None, queries=20, top_k=3):
+    from azure.search.documents.models import VectorizedQuery
+    from .chat import _search
+    from .clients import search_client
+    from .config import PARTITION_FIELDS, build_filter, get_settings
+
+    index_name = index_name or get_settings().index_name
+    client = search_client(index_name)
+    facets = client.search(search_text="*", facets=[f"{name},count:50" for name in PARTITION_FIELDS], top=0).get_facets()
+    partitions = [(name, facet["value"], facet["count"]) for name in PARTITION_FIELDS for facet in facets.get(name, [])]
+    if not partitions:
+        print(f"No partition values in '{index_name}'; ingest some with --partition first.")
+        return 1
+    total = client.get_document_count()
+
+    def query(vector, exhaustive=False):
+        return VectorizedQuery(vector=vector, k_nearest_neighbors=top_k, fields="vector", exhaustive=exhaustive)
+
+    def results(docs):
+        return {(doc["question"], doc["answer"]) for doc in docs}
+
+    print(f"'{index_name}': {total} documents, top {top_k}, {queries} queries per partition and mode")
+    print(
+        f"{'partition':<28}{'share':>7}{'prefilter ms':>14}{'postfilter ms':>15}"
+        f"{'prefilter recall':>18}{'postfilter recall':>19}{'short results':>15}"
+    )
+    for name, value, count in sorted(partitions, key=lambda partition: partition[2]):
+        filter = build_filter({name: value})
+        sample = list(client.search(search_text="*", filter=filter, select=["vector"], top=queries))
+        vectors = [doc["vector"] for doc in sample if doc.get("vector")]
+        if not vectors:
+            print(f"{name}={value}: no retrievable vectors")
+            continue
+        # One untimed request per partition, so connection setup is not measured
+        _search(index_name, query(vectors[0]), top_k, filter=filter)
+        seconds = {"preFilter": [], "postFilter": []}
+        recall = {"preFilter": [], "postFilter": []}
+        short = 0
+        for vector in vectors:
+            _, exact = _search(index_name, query(vector, exhaustive=True), top_k, filter=filter)
+            expected = results(exact)
+            for mode in seconds:
+                start = time.perf_counter()
+                _, docs = _search(index_name, query(vector), top_k, filter=filter, filter_mode=mode)
+                seconds[mode].append((time.perf_counter() - start) * 1000)
+                recall[mode].append(len(results(docs) & expected) / max(len(expected), 1))
+                short += mode == "postFilter" and len(docs) < len(expected)
+        print(
+            f"{f'{name}={value}':<28}{count / max(total, 1):>7.1%}"
+            f"{statistics.median(seconds['preFilter']):>14.1f}{statistics.median(seconds['postFilter']):>15.1f}"
+            f"{statistics.mean(recall['preFilter']):>18.2f}{statistics.mean(recall['postFilter']):>19.2f}{short:>15}"
+        )
+    return 0
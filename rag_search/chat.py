@@ -0,0 +1,302 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from .clients import openai_client, search_client
+from .coalescing import ExpiringCache, SingleFlight, normalize_question
+from .config import SEMANTIC_CONFIG_NAME, build_filter, get_settings
+from .latency_budget import BudgetExceeded, FallbackContextCache, hedged_call, latency_tracker, stage_budget_ms
+
+# The Azure Search and OpenAI SDKs are imported inside the functions below, so the
+# prompt is shown before they load; warm_up() loads them in the background meanwhile.
+# Requests are sent without SDK retries: hedged_call() retries and hedges within the
+# stage's budget, and an SDK retry would keep an abandoned attempt's thread busy.
+
+# Reciprocal rank fusion constant for merging results from several indexes
+RRF_K = 60
+# Vector candidates (k) for plain vector search
+VECTOR_K = 5
+VECTORIZER_K = 50
+# Vector candidates for hybrid search, and the most the semantic ranker gets when
+# the hybrid ranking is ambiguous (it reranks at most 50 results)
+HYBRID_DEPTH = 10
+SEMANTIC_MAX_DEPTH = 50
+# Relative gap between the top two hybrid scores below which a ranking is ambiguous
+DEFAULT_SEMANTIC_RERANK_MARGIN = 0.01
+# How long an answer to a first question is reused (0 disables the answer cache)
+DEFAULT_ANSWER_CACHE_TTL_SECONDS = 600
+
+fallback_contexts = FallbackContextCache()
+# Question embeddings and answers, shared by concurrent and repeated questions
+embedding_cache = ExpiringCache()
+answer_cache = ExpiringCache()
+_in_flight = SingleFlight()
+_fanout_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fanout")
+
+
+def _embed(question):
+    cached = embedding_cache.get(normalize_question(question))
+    if cached is not None:
+        return cached
+    emb_resp = openai_client().with_options(max_retries=0).embeddings.create(
+        input=question, model=get_settings().embedding_name, timeout=stage_budget_ms("embedding") / 1000
+    )
+    embedding = emb_resp.data[0].embedding
+    embedding_cache.put(normalize_question(question), embedding)
+    return embedding
+
+
+# Search one index. With search_text the request is hybrid: the service runs BM25
+# over the text and the vector query, and fuses both rankings. With semantic=True
+# the fused candidates are reranked by the semantic ranker. A filter is applied
+# before the vector search (preFilter), so k neighbours come from the partition itself;
+# `rag-search bench filters --live` also runs it with postFilter.
+def _search(index_name, vector_query, top, search_text=None, semantic=False, filter=None, filter_mode="preFilter"):
+    kwargs = {}
+    if semantic:
+        kwargs = {"query_type": "semantic", "semantic_configuration_name": SEMANTIC_CONFIG_NAME}
+    if filter:
+        kwargs.update(filter=filter, vector_filter_mode=filter_mode)
+    results = search_client(index_name).search(
+        search_text=search_text,
+        vector_queries=[vector_query],
+        select=["question", "answer"],
+        top=top,
+        include_total_count=True,
+        timeout=stage_budget_ms("semantic" if semantic else "search") / 1000,
+        retry_total=0,
+        **kwargs,
+    )
+    # The request is only sent when the results are iterated, so consume them here
+    return results.get_count(), list(results)
+
+
+# Returns a function building the vector query for a given candidate depth (k),
+# or None if the question could not be embedded.
+def _query_factory(question, vectorizer):
+    if vectorizer:
+        # VectorizableTextQuery: the index embeds the question with its vectorizer
+        from azure.search.documents.models import VectorizableTextQuery
+
+        return lambda k: VectorizableTextQuery(text=question, k_nearest_neighbors=k, fields="vector")
+
+    # VectorizedQuery: the question is embedded here and the vector is sent to the index
+    from azure.search.documents.models import VectorizedQuery
+
+    vector_emb = hedged_call("embedding", lambda: _embed(question))
+    if not vector_emb:
+        return None
+    return lambda k: VectorizedQuery(
+        vector=vector_emb, k_nearest_neighbors=k, fields="vector", kind="vector", exhaustive=True
+    )
+
+
+# Query several indexes at once, each under the stage's budget. An index that
+# fails or overruns is left out, so the wait is bounded by the slowest index's budget.
+# search(index_name) returns (total count, results).
+def _search_indexes(index_names, stage, search):
+    budget_ms = stage_budget_ms(stage)
+    futures = {}
+    for index_name in index_names:
+        futures[index_name] = _fanout_executor.submit(
+            hedged_call, f"{stage}[{index_name}]", functools.partial(search, index_name), budget_ms
+        )
+    ranked = {}
+    for index_name, future in futures.items():
+        try:
+            ranked[index_name] = future.result()
+        except Exception as ex:
+            print(f"{stage.capitalize()} on '{index_name}' failed:", ex)
+    if not ranked:
+        raise RuntimeError(f"{stage.capitalize()} failed on all indexes: {', '.join(index_names)}")
+    return ranked
+
+
+def semantic_rerank_margin():
+    return float(os.getenv("SEMANTIC_RERANK_MARGIN", DEFAULT_SEMANTIC_RERANK_MARGIN))
+
+
+# How unsure a hybrid ranking is, from the relative gap between the top two scores:
+# 0 once the top result leads by the rerank margin or more, rising to 1 for a tie.
+# A margin of 0 or less turns semantic reranking off.
+def ranking_ambiguity(docs):
+    rerank_margin = semantic_rerank_margin()
+    if len(docs) < 2 or rerank_margin <= 0:
+        return 0.0
+    first, second = docs[0]["@search.score"], docs[1]["@search.score"]
+    if not first:
+        return 1.0
+    margin = (first - second) / first
+    return max(0.0, 1 - margin / rerank_margin)
+
+
+# Query planner for hybrid results: clear rankings are used as they are, ambiguous
+# ones are sent to the semantic ranker with more candidates the closer the call is.
+# If reranking fails or overruns its budget, the hybrid results are kept.
+def _rerank_if_ambiguous(question, make_query, ranked, top_k, filter=None):
+    ambiguity = max(ranking_ambiguity(docs) for _, docs in ranked.values())
+    if ambiguity == 0:
+        latency_tracker.count("semantic", "skipped")
+        return ranked
+    depth = HYBRID_DEPTH + round((SEMANTIC_MAX_DEPTH - HYBRID_DEPTH) * ambiguity)
+    print(f"Ambiguous ranking ({ambiguity:.2f}): semantic reranking over {depth} vector candidates")
+    try:
+        reranked = _search_indexes(
+            list(ranked),
+            "semantic",
+            lambda index_name: _search(index_name, make_query(depth), top_k, question, semantic=True, filter=filter),
+        )
+    except Exception as ex:
+        print("Degraded mode: skipping semantic reranking:", ex)
+        return ranked
+    return {**ranked, **reranked}
+
+
+# Cached contexts are only reused for the same partition
+def _fallback_key(question, filter):
+    return f"{filter}\n{question}" if filter else question
+
+
+# Reciprocal rank fusion: each document scores sum(1 / (k + rank)) over the result
+# lists it appears in. The same FAQ entry found in several indexes is merged by question.
+def fuse_results(result_lists, top_k, k=RRF_K):
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, 1):
+            key = " ".join(doc["question"].lower().split())
+            scores[key] = scores.get(key, 0) + 1 / (k + rank)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)[:top_k]]
+
+
+# Retrieve context from one or more Azure AI Search indexes (default: AZURE_SEARCH_INDEX_NAME).
+# With hybrid=True, BM25 and vector results come back fused from one request; with
+# vectorizer=True as well, ambiguous rankings are also semantically reranked.
+# filters ({"tenant": ..., "product": ..., "language": ...}) scope the search to one partition.
+# Each stage runs under its latency budget with a hedged duplicate request; on
+# overrun the last good context for the question is reused, or none at all.
+def retrieve_context(question, top_k=3, vectorizer=False, index_names=None, hybrid=False, filters=None):
+    index_names = index_names or [get_settings().index_name]
+    filter = build_filter(filters)
+    try:
+        make_query = _query_factory(question, vectorizer)
+        if make_query is None:
+            print("No vector loaded, skipping search.")
+            return []
+        if hybrid:
+            # At least two results are needed to judge the ranking
+            ranked = _search_indexes(
+                index_names,
+                "search",
+                lambda index_name: _search(index_name, make_query(HYBRID_DEPTH), max(top_k, 2), question, filter=filter),
+            )
+        else:
+            k = VECTORIZER_K if vectorizer else VECTOR_K
+            ranked = _search_indexes(
+                index_names, "search", lambda index_name: _search(index_name, make_query(k), top_k, filter=filter)
+            )
+    except Exception as ex:
+        print("Vector search failed:", ex)
+        cached = fallback_contexts.get(_fallback_key(question, filter))
+        print("Degraded mode:", "using cached context" if cached is not None else "answering without retrieval")
+        return cached or []
+
+    # Only indexes with a vectorizer have a semantic configuration
+    if hybrid and vectorizer:
+        ranked = _rerank_if_ambiguous(question, make_query, ranked, top_k, filter)
+
+    print(f"Total results: {sum(total for total, _ in ranked.values())}")
+    context = ''
+    for doc in fuse_results([docs for _, docs in ranked.values()], top_k):
+        context += f"- Question: {doc['question']}, Answer: {doc['answer']}\n"
+    context = context.split('\n') if context else []
+    fallback_contexts.put(_fallback_key(question, filter), context)
+    return context
+
+
+# Stable instructions, sent first and byte-identical on every request so the service
+# can cache the prompt prefix. Retrieved context changes per question, so it goes
+# into the last user message instead.
+SYSTEM_PROMPT = (
+    "You are an AI assistant. Answer the user's questions using the context provided with each question."
+)
+TIMEOUT_REPLY = "Sorry, the assistant is taking too long to respond. Please try again."
+
+
+def user_message(question, context):
+    if not context:
+        return {"role": "user", "content": question}
+    return {"role": "user", "content": "Context:\n" + "\n---\n".join(context) + f"\n\nQuestion: {question}"}
+
+
+# Chat completion under the stage's latency budget, with a hedged duplicate request
+def complete(messages, stage="chat"):
+    return hedged_call(
+        stage,
+        lambda: openai_client().with_options(max_retries=0).chat.completions.create(
+            model=get_settings().deployment_name, messages=messages, timeout=stage_budget_ms(stage) / 1000
+        ),
+    )
+
+
+def answer_cache_ttl():
+    return float(os.getenv("ANSWER_CACHE_TTL_SECONDS", DEFAULT_ANSWER_CACHE_TTL_SECONDS))
+
+
+# Retrieve and generate the answer to a question asked without prior conversation;
+# returns (chat completion, shared). shared is True if the completion came from the
+# cache or another caller's in-flight request, i.e. this call spent no tokens. Answers are cached for ANSWER_CACHE_TTL_SECONDS, and
+# concurrent calls for the same normalized question and options share one in-flight
+# request, so a spike of identical questions costs one embedding, search and completion.
+# Raises BudgetExceeded if the completion overruns its budget.
+def answer(question, vectorizer=False, index_names=None, hybrid=False, filters=None):
+    index_names = index_names or [get_settings().index_name]
+    key = (normalize_question(question), vectorizer, tuple(index_names), hybrid, build_filter(filters))
+    resp = answer_cache.get(key)
+    if resp is not None:
+        latency_tracker.count("chat", "cache_hit")
+        return resp, True
+
+    def generate():
+        context = retrieve_context(
+            question, vectorizer=vectorizer, index_names=index_names, hybrid=hybrid, filters=filters
+        )
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            user_message(question, context),
+        ]
+        resp = complete(messages)
+        # Answers given without context (nothing found, or retrieval degraded) are not reused
+        if context:
+            answer_cache.put(key, resp, answer_cache_ttl())
+        return resp
+
+    resp, shared = _in_flight.do(key, generate)
+    if shared:
+        latency_tracker.count("chat", "coalesced")
+    return resp, shared
+
+
+# Chat function to interact with the user (single turn, see conversation.py for sessions)
+def chat(question, vectorizer=False, index_names=None, hybrid=False, filters=None):
+    try:
+        resp, _ = answer(question, vectorizer=vectorizer, index_names=index_names, hybrid=hybrid, filters=filters)
+    except BudgetExceeded as ex:
+        print("Chat completion failed:", ex)
+        return TIMEOUT_REPLY
+    return resp.choices[0].message.content
+
+
+# Build the clients and import the query models while the user is typing.
+# Errors are ignored here; they surface again on the first question.
+def warm_up(vectorizer=False, index_names=None):
+    try:
+        openai_client()
+        for index_name in index_names or [get_settings().index_name]:
+            search_client(index_name)
+        if vectorizer:
+            from azure.search.documents.models import VectorizableTextQuery  # noqa: F401
+        else:
+            from azure.search.documents.models import VectorizedQuery  # noqa: F401
+    except Exception:
+        pass
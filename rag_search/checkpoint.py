@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+
+CHECKPOINT_DIR = ".checkpoints"
+
+
+# Stable document id for a source row, so re-uploading a batch after a resume
+# overwrites the documents it already wrote instead of duplicating them. The scope
+# (e.g. the row's partition values) keeps rows of different source files apart.
+def document_id(index_name, row_number, question, scope=""):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{index_name}/{scope}/{row_number}/{question}"))
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Append-only journal of an ingest run. It records whether the index was created,
+# which row ranges were embedded (their vectors are saved next to it) and which
+# upload batches the index acknowledged.
+# A run of the same pipeline over the same source file and settings (batch sizes,
+# dedup threshold, ...) resumes from it; anything else starts over.
+class CheckpointJournal:
+    def __init__(self, pipeline, index_name, source_path, settings, directory=CHECKPOINT_DIR):
+        self.directory = os.path.join(directory, index_name)
+        self.journal_path = os.path.join(self.directory, "journal.jsonl")
+        self.header = {
+            "event": "start",
+            "pipeline": pipeline,
+            "index": index_name,
+            "source": os.path.abspath(source_path),
+            "source_sha256": file_sha256(source_path),
+            "settings": settings,
+        }
+        self.index_ready = False
+        self.embedded = {}
+        self.uploaded = set()
+        self.resuming = self._load()
+        if not self.resuming:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.makedirs(self.directory)
+            self._append(self.header)
+
+    def _load(self):
+        if not os.path.exists(self.journal_path):
+            return False
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+        if not entries or entries[0] != self.header:
+            return False
+        if len(entries) < len(lines):
+            # Drop a torn last line from a crash mid-write; everything before it is intact
+            with open(self.journal_path, "w", encoding="utf-8") as f:
+                f.writelines(lines[: len(entries)])
+        for entry in entries[1:]:
+            if entry["event"] == "index_ready":
+                self.index_ready = True
+            elif entry["event"] == "embedded":
+                self.embedded[entry["start"]] = entry
+            elif entry["event"] == "uploaded":
+                self.uploaded.add(entry["start"])
+        return True
+
+    def _append(self, entry):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # The index exists; a run that died before this creates it again
+    def record_index_ready(self):
+        self._append({"event": "index_ready"})
+        self.index_ready = True
+
+    # Vectors for rows [start, start + count) if that exact batch was embedded before
+    def load_vectors(self, start, count):
+        entry = self.embedded.get(start)
+        if entry is None or entry["end"] != start + count:
+            return None
+        return np.load(os.path.join(self.directory, entry["file"]))
+
+    def record_embedded(self, start, vectors):
+        file_name = f"vectors_{start:09d}.npy"
+        tmp_path = os.path.join(self.directory, file_name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, vectors)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, file_name))
+        entry = {"event": "embedded", "start": start, "end": start + len(vectors), "file": file_name}
+        self._append(entry)
+        self.embedded[start] = entry
+
+    def is_uploaded(self, start):
+        return start in self.uploaded
+
+    def record_uploaded(self, start, end):
+        self._append({"event": "uploaded", "start": start, "end": end})
+        self.uploaded.add(start)
+
+    # The run finished, the next one starts from scratch
+    def complete(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
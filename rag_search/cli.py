@@ -0,0 +1,149 @@
+import argparse
+from .config import PARTITION_FIELDS
+
+# Command-line entry point. Only argparse (and the settings module) is imported up
+# front; each subcommand imports its module (and with it the Azure/OpenAI SDKs and
+# NumPy) when it runs.
+
+
+# "tenant=contoso" -> ("tenant", "contoso")
+def _key_value(text):
+    key, sep, value = text.partition("=")
+    if not sep or not key or not value:
+        raise argparse.ArgumentTypeError(f"expected key=value, got '{text}'")
+    return key, value
+
+
+# "tenant=contoso", for one of the partition fields
+def _partition_value(text):
+    key, value = _key_value(text)
+    if key not in PARTITION_FIELDS:
+        raise argparse.ArgumentTypeError(f"unknown partition field '{key}', expected one of: {', '.join(PARTITION_FIELDS)}")
+    return key, value
+
+
+def _ingest(args):
+    options = {
+        "source": args.source,
+        "vectorizer": args.vectorizer,
+        "faq_data_path": args.file,
+        "partition_defaults": dict(args.partition or ()),
+        "keep_index": args.keep_index,
+    }
+    if args.workers is None and args.shards is None and args.queue is None:
+        from .ingest import run_ingest
+
+        run_ingest(**options)
+        return
+    from .sharding import DEFAULT_INGEST_WORKERS, run_sharded_ingest
+
+    workers = DEFAULT_INGEST_WORKERS if args.workers is None else args.workers
+    return run_sharded_ingest(workers=workers, shards=args.shards, queue_path=args.queue, **options)
+
+
+def _ingest_worker(args):
+    from .config import get_settings
+    from .sharding import default_queue_path, run_worker
+
+    return run_worker(args.queue or default_queue_path(get_settings().index_name), faq_data_path=args.file)
+
+
+def _pull(args):
+    from .pull import run_pull
+
+    run_pull(vectorizer=args.vectorizer)
+
+
+def _chat(args):
+    from .conversation import run_chat
+    from .config import get_settings
+
+    settings = get_settings()
+    if args.federated:
+        index_names = [settings.index_name, settings.pull_index_name]
+    else:
+        index_names = args.index or [settings.index_name]
+    run_chat(vectorizer=args.vectorizer, index_names=index_names, hybrid=args.hybrid, filters=dict(args.filter or ()))
+
+
+def _export(args):
+    from .config import get_settings
+    from .snapshot import export_snapshot
+
+    export_snapshot(args.index or get_settings().index_name, args.path)
+
+
+def _restore(args):
+    from .snapshot import restore_snapshot
+
+    restore_snapshot(args.path, index_name=args.index, vectorizer=args.vectorizer, workers=args.workers)
+
+
+def _bench(args):
+    from . import bench
+
+    if args.target == "startup":
+        return bench.bench_startup(runs=args.runs)
+    if args.target == "filters":
+        return bench.bench_filters_live(index_name=args.index) if args.live else bench.bench_filters()
+    return bench.bench_embeddings()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="rag-search", description="Minimal RAG with Azure AI Search")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Push: embed FAQ data and upload it to the index")
+    ingest.add_argument("--source", choices=("local", "blob"), default="local", help="read data/faq.csv or download faq_blob.csv from Blob Storage")
+    ingest.add_argument("--file", help="local CSV file with question and answer columns (default: data/faq.csv)")
+    ingest.add_argument("--vectorizer", action="store_true", help="add a vectorizer and semantic configuration to the index")
+    ingest.add_argument("--partition", type=_partition_value, action="append", metavar="FIELD=VALUE", help="tenant, product or language for rows without that CSV column, repeatable")
+    ingest.add_argument("--keep-index", action="store_true", help="add to the existing index instead of recreating it, e.g. to load several tenants; replaces the documents ingested earlier from a file of the same name")
+    ingest.add_argument("--workers", type=int, help="ingest in hash shards with this many worker processes")
+    ingest.add_argument("--shards", type=int, help="number of shards (default: 4 per worker)")
+    ingest.add_argument("--queue", help="shard queue file, shared with workers on other machines (default: .checkpoints/<index>.shards.sqlite)")
+    ingest.set_defaults(func=_ingest)
+
+    ingest_worker = subparsers.add_parser("ingest-worker", help="Join a sharded ingest as a worker, e.g. from another machine")
+    ingest_worker.add_argument("--queue", help="shard queue file of the ingest (default: .checkpoints/<index>.shards.sqlite)")
+    ingest_worker.add_argument("--file", help="where the job's CSV is on this machine (default: the path it was started with)")
+    ingest_worker.set_defaults(func=_ingest_worker)
+
+    pull = subparsers.add_parser("pull", help="Pull: create the data source, skillset and indexer for the -pull index")
+    pull.add_argument("--vectorizer", action="store_true", help="add a vectorizer and semantic configuration to the index")
+    pull.set_defaults(func=_pull)
+
+    chat = subparsers.add_parser("chat", help="Chat with the indexed FAQ in the terminal")
+    chat.add_argument("--vectorizer", action="store_true", help="let the index embed questions (VectorizableTextQuery)")
+    chat.add_argument("--hybrid", action="store_true", help="combine BM25 and vector search; with --vectorizer, rerank ambiguous results semantically")
+    chat.add_argument("--filter", type=_partition_value, action="append", metavar="FIELD=VALUE", help="only search one tenant, product or language, repeatable")
+    chat_indexes = chat.add_mutually_exclusive_group()
+    chat_indexes.add_argument("--index", action="append", help="index to query, repeat to search several at once (default: AZURE_SEARCH_INDEX_NAME)")
+    chat_indexes.add_argument("--federated", action="store_true", help="search the push and -pull indexes together")
+    chat.set_defaults(func=_chat)
+
+    export = subparsers.add_parser("export", help="Export an index, vectors included, to a snapshot file")
+    export.add_argument("path", help="snapshot file to write (.npz)")
+    export.add_argument("--index", help="index to export (default: AZURE_SEARCH_INDEX_NAME)")
+    export.set_defaults(func=_export)
+
+    restore = subparsers.add_parser("restore", help="Create an index from a snapshot file without re-embedding")
+    restore.add_argument("path", help="snapshot file to load (.npz)")
+    restore.add_argument("--index", help="index to create (default: the exported index name)")
+    restore.add_argument("--vectorizer", action=argparse.BooleanOptionalAction, default=None, help="add a vectorizer and semantic configuration (default: as exported)")
+    restore.add_argument("--workers", type=int, default=4, help="parallel upload requests")
+    restore.set_defaults(func=_restore)
+
+    bench = subparsers.add_parser("bench", help="Run a benchmark")
+    bench.add_argument("target", choices=("startup", "embeddings", "filters"), help="CLI cold start, embedding parse/memory or prefilter vs postfilter")
+    bench.add_argument("--live", action="store_true", help="filters: time preFilter vs postFilter on the index instead of simulating recall offline")
+    bench.add_argument("--index", help="index for --live (default: AZURE_SEARCH_INDEX_NAME)")
+    bench.add_argument("--runs", type=int, default=5, help="cold starts to measure (startup only)")
+    bench.set_defaults(func=_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args) or 0
@@ -0,0 +1,71 @@
+import functools
+import threading
+from .config import get_settings
+
+# Clients are built on first use and shared for the life of the process. The SDK
+# imports live inside the factories so that importing this module stays cheap.
+_lock = threading.Lock()
+
+
+def _shared(factory):
+    instances = {}
+
+    @functools.wraps(factory)
+    def get(*args):
+        if args not in instances:
+            with _lock:
+                if args not in instances:
+                    instances[args] = factory(*args)
+        return instances[args]
+
+    return get
+
+
+@_shared
+def openai_client():
+    from openai import AzureOpenAI
+
+    settings = get_settings()
+    return AzureOpenAI(
+        azure_endpoint=settings.openai_endpoint,
+        api_key=settings.openai_api_key,
+        api_version=settings.api_version,
+    )
+
+
+@_shared
+def search_client(index_name):
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents import SearchClient
+
+    settings = get_settings()
+    return SearchClient(
+        endpoint=settings.search_endpoint,
+        index_name=index_name,
+        credential=AzureKeyCredential(settings.search_key),
+    )
+
+
+@_shared
+def index_client():
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents.indexes import SearchIndexClient
+
+    settings = get_settings()
+    return SearchIndexClient(settings.search_endpoint, AzureKeyCredential(settings.search_key))
+
+
+@_shared
+def indexer_client():
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents.indexes import SearchIndexerClient
+
+    settings = get_settings()
+    return SearchIndexerClient(endpoint=settings.search_endpoint, credential=AzureKeyCredential(settings.search_key))
+
+
+@_shared
+def blob_service_client():
+    from azure.storage.blob import BlobServiceClient
+
+    return BlobServiceClient.from_connection_string(get_settings().blob_connection_string)
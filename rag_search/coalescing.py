@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# "How do I  reset my Password?" and "how do i reset my password?" are the same question
+def normalize_question(question):
+    return " ".join(question.lower().split())
+
+
+# Single-flight: while a call for a key is running, callers with the same key wait
+# for it and share its result (or its exception) instead of repeating the work.
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    # Returns (result, shared); shared is True for callers that joined a running call
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                shared = True
+            else:
+                shared = False
+                future = self._calls[key] = Future()
+        if shared:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as ex:
+            future.set_exception(ex)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+# LRU cache whose entries expire ttl_seconds after they were stored (None: never)
+class ExpiringCache:
+    def __init__(self, max_entries=1024):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl_seconds=None):
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            return
+        with self._lock:
+            expires = None if ttl_seconds is None else time.monotonic() + ttl_seconds
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
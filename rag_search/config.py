@@ -0,0 +1,65 @@
+import os
+from dataclasses import dataclass
+from functools import cache
+
+# Semantic configuration of indexes created with a vectorizer
+SEMANTIC_CONFIG_NAME = "faq-semantic-config"
+# Filterable fields that scope a document to a tenant, product and language
+PARTITION_FIELDS = ("tenant", "product", "language")
+# Filterable field naming the file a pushed document was ingested from
+SOURCE_FIELD = "source_file"
+
+
+# OData filter matching every given partition value, e.g. {"tenant": "contoso"}
+# becomes "tenant eq 'contoso'" and None matches documents without a value.
+# Returns None for no filters.
+def build_filter(filters):
+    clauses = []
+    for name, value in (filters or {}).items():
+        if name not in PARTITION_FIELDS:
+            raise ValueError(f"Unknown partition field '{name}', expected one of: {', '.join(PARTITION_FIELDS)}")
+        if value is None:
+            clauses.append(f"{name} eq null")
+        else:
+            escaped = str(value).replace("'", "''")
+            clauses.append(f"{name} eq '{escaped}'")
+    return " and ".join(clauses) or None
+
+
+@dataclass(frozen=True)
+class Settings:
+    search_endpoint: str
+    search_key: str
+    index_name: str
+    openai_endpoint: str
+    openai_api_key: str
+    embedding_name: str
+    deployment_name: str
+    api_version: str
+    blob_connection_string: str
+    blob_container_name: str
+
+    # Index filled by the Azure AI Search indexer (pull)
+    @property
+    def pull_index_name(self):
+        return f"{self.index_name}-pull"
+
+
+# Settings from the environment and .env, read once on first use
+@cache
+def get_settings():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings(
+        search_endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+        search_key=os.getenv("AZURE_SEARCH_KEY"),
+        index_name=os.getenv("AZURE_SEARCH_INDEX_NAME"),
+        openai_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        embedding_name=os.getenv("AZURE_OPENAI_EMBEDDING_NAME"),
+        deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION", ""),
+        blob_connection_string=os.getenv("AZURE_BLOB_STORAGE_CONNECTION_STRING"),
+        blob_container_name=os.getenv("AZURE_BLOB_CONTAINER_NAME"),
+    )
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from .chat import SYSTEM_PROMPT, TIMEOUT_REPLY, answer, complete, retrieve_context, user_message, warm_up
+from .latency_budget import BudgetExceeded, latency_tracker
+from .warmup import log_question, warmup_top_n
+
+# History (summary + verbatim turns) is compacted once it grows past this many tokens
+DEFAULT_HISTORY_TOKEN_BUDGET = 2000
+# Most recent turns that are always kept verbatim
+KEEP_RECENT_TURNS = 2
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation between a user and an AI assistant below in at most 150 words. "
+    "Keep facts, names and open questions the user may refer back to."
+)
+
+
+def history_token_budget():
+    return int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", DEFAULT_HISTORY_TOKEN_BUDGET))
+
+
+# Rough token count (~4 characters per token for English), good enough for budgeting
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+# A multi-turn chat. Each request is laid out as
+#   system prompt | summary of older turns | earlier turns verbatim | context + question
+# so consecutive requests share a byte-identical prefix that the service can cache.
+# The summary, and with it the prefix, only changes when the history outgrows its
+# token budget and the older turns are folded into it in one go.
+class ConversationSession:
+    def __init__(self, vectorizer=False, index_names=None, hybrid=False, filters=None):
+        self.retrieval_options = {
+            "vectorizer": vectorizer,
+            "index_names": index_names,
+            "hybrid": hybrid,
+            "filters": filters,
+        }
+        self.summary = ""
+        self.turns = []
+        self.turn_stats = []
+
+    def _history_messages(self):
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        for question, reply in self.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": reply})
+        return messages
+
+    # Follow-ups such as "and on mobile?" retrieve poorly on their own, so the
+    # previous question is searched together with them
+    def retrieval_query(self, question):
+        if not self.turns:
+            return question
+        return f"{self.turns[-1][0]} {question}"
+
+    def ask(self, question):
+        start_time = time.perf_counter()
+        shared = False
+        try:
+            if self.turns or self.summary:
+                context = retrieve_context(self.retrieval_query(question), **self.retrieval_options)
+                resp = complete(self._history_messages() + [user_message(question, context)])
+            else:
+                # Without history the request is the same for every user asking this
+                # question, so it is shared with concurrent and recent identical ones
+                log_question(question)
+                resp, shared = answer(question, **self.retrieval_options)
+        except BudgetExceeded as ex:
+            print("Chat completion failed:", ex)
+            return TIMEOUT_REPLY
+        reply = resp.choices[0].message.content
+        self.turns.append((question, reply))
+
+        # A shared answer was paid for by an earlier or concurrent request, not this turn
+        usage = None if shared else resp.usage
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.turn_stats.append(
+            {
+                "input_tokens": usage.prompt_tokens if usage else 0,
+                "cached_tokens": getattr(details, "cached_tokens", None) or 0,
+                "output_tokens": usage.completion_tokens if usage else 0,
+                "latency_ms": (time.perf_counter() - start_time) * 1000,
+                "shared_answer": shared,
+            }
+        )
+        self._compact()
+        return reply
+
+    def history_tokens(self):
+        return estimate_tokens(self.summary) + sum(estimate_tokens(q) + estimate_tokens(a) for q, a in self.turns)
+
+    def _compact(self):
+        if self.history_tokens() <= history_token_budget() or len(self.turns) <= KEEP_RECENT_TURNS:
+            return
+        older, self.turns = self.turns[:-KEEP_RECENT_TURNS], self.turns[-KEEP_RECENT_TURNS:]
+        transcript = "\n".join(f"User: {q}\nAssistant: {a}" for q, a in older)
+        if self.summary:
+            transcript = f"Earlier summary: {self.summary}\n{transcript}"
+        try:
+            resp = complete(
+                [{"role": "system", "content": SUMMARY_PROMPT}, {"role": "user", "content": transcript}],
+                stage="summary",
+            )
+            self.summary = resp.choices[0].message.content
+        except Exception as ex:
+            # The older turns are dropped either way, so the history stays bounded
+            print("Summarizing earlier turns failed:", ex)
+
+
+# Main loop to interact with the user
+def run_chat(vectorizer=False, index_names=None, hybrid=False, filters=None):
+    threading.Thread(target=warm_up, args=(vectorizer, index_names), daemon=True).start()
+    # Opt-in (WARMUP_TOP_N): pre-answer the most asked questions from earlier sessions in the background
+    if warmup_top_n() > 0:
+        from .warmup import warm_cache
+
+        threading.Thread(
+            target=warm_cache,
+            kwargs={"vectorizer": vectorizer, "index_names": index_names, "hybrid": hybrid, "filters": filters},
+            daemon=True,
+        ).start()
+    session = ConversationSession(vectorizer=vectorizer, index_names=index_names, hybrid=hybrid, filters=filters)
+    while True:
+        q = input("You: ")
+        if q.lower() in ("exit", "quit"):
+            break
+        answered_turns = len(session.turn_stats)
+        ans = session.ask(q)
+        print("AI:", ans)
+        if len(session.turn_stats) > answered_turns:
+            stats = session.turn_stats[-1]
+            if stats["shared_answer"]:
+                print(f"Turn latency: {stats['latency_ms']:.0f} ms, answer reused from cache, no tokens spent")
+            else:
+                print(
+                    f"Turn latency: {stats['latency_ms']:.0f} ms, input tokens: {stats['input_tokens']} "
+                    f"(cached {stats['cached_tokens']}), output tokens: {stats['output_tokens']}"
+                )
+    # Per-stage latency percentiles, hedge and budget overrun counts
+    for stage, stats in latency_tracker.summary().items():
+        print(f"{stage}: {stats}")
@@ -0,0 +1,108 @@
+import os
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# Cosine similarity at or above which two questions are treated as paraphrases
+DEFAULT_DEDUP_THRESHOLD = 0.95
+# Rows compared per block; a block of similarities is BLOCK_SIZE x n float32 values
+BLOCK_SIZE = 1024
+# Above this many vectors, use a local ANN index (hnswlib) when it is installed
+ANN_MIN_VECTORS = 50000
+ANN_NEIGHBORS = 16
+
+
+def dedup_threshold():
+    return float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", DEFAULT_DEDUP_THRESHOLD))
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# Exact pairs (i, j), i < j, with similarity >= threshold. Only the upper triangle
+# is computed, one block of rows at a time, so memory stays at BLOCK_SIZE x n.
+def _blocked_pairs(unit, threshold, block_size):
+    for start in range(0, len(unit), block_size):
+        block = unit[start : start + block_size]
+        sims = block @ unit[start:].T
+        rows, cols = np.nonzero(sims >= threshold)
+        cols += start
+        upper = cols > rows + start
+        yield from zip((rows[upper] + start).tolist(), cols[upper].tolist())
+
+
+# Approximate pairs from the nearest neighbours of each vector
+def _ann_pairs(unit, threshold):
+    index = hnswlib.Index(space="ip", dim=unit.shape[1])
+    index.init_index(max_elements=len(unit), ef_construction=200, M=16)
+    index.add_items(unit)
+    index.set_ef(max(ANN_NEIGHBORS * 2, 50))
+    labels, distances = index.knn_query(unit, k=min(ANN_NEIGHBORS, len(unit)))
+    # hnswlib's "ip" distance is 1 - inner product
+    for i, (neighbors, dists) in enumerate(zip(labels, distances)):
+        for j, dist in zip(neighbors.tolist(), dists.tolist()):
+            if j != i and 1 - dist >= threshold:
+                yield min(i, j), max(i, j)
+
+
+# Group rows into clusters of near-duplicates. Rows are taken in order; a row not yet
+# in a cluster starts one, and every later unclustered row similar to it (and with
+# the same key, if keys are given) joins it. Members are compared with the cluster's
+# first row itself, so A~B and B~C do not pull in C unless A~C as well.
+# Each cluster is a sorted list of row numbers; rows without duplicates are singletons.
+def cluster_near_duplicates(vectors, threshold=None, block_size=BLOCK_SIZE, keys=None):
+    threshold = dedup_threshold() if threshold is None else threshold
+    unit = _normalize(vectors)
+
+    if hnswlib is not None and len(unit) >= ANN_MIN_VECTORS:
+        pairs = _ann_pairs(unit, threshold)
+    else:
+        pairs = _blocked_pairs(unit, threshold, block_size)
+    similar = {}
+    for i, j in pairs:
+        similar.setdefault(i, set()).add(j)
+
+    clustered = set()
+    clusters = []
+    for i in range(len(unit)):
+        if i in clustered:
+            continue
+        cluster = [i]
+        for j in sorted(similar.get(i, ())):
+            if j not in clustered and (keys is None or keys[j] == keys[i]):
+                cluster.append(j)
+                clustered.add(j)
+        clusters.append(cluster)
+    return clusters
+
+
+def _normalize_text(text):
+    return " ".join((text or "").lower().split())
+
+
+# Keep the first document of each near-duplicate cluster and attach the other
+# questions to it as "alternate_questions". Docs reference their vector with "vector_row".
+# Only docs with the same answer (ignoring case and spacing) and equal values for the
+# group_by fields are collapsed: a similar question with a different answer (say, for
+# another platform) stays a document of its own.
+def collapse_near_duplicates(docs, store, threshold=None, group_by=()):
+    keys = [(*(doc.get(field) for field in group_by), _normalize_text(doc["answer"])) for doc in docs]
+    vectors = store.vectors[[doc["vector_row"] for doc in docs]]
+
+    canonical_docs = []
+    for cluster in cluster_near_duplicates(vectors, threshold, keys=keys):
+        canonical = dict(docs[cluster[0]])
+        alternates = []
+        for i in cluster[1:]:
+            question = docs[i]["question"]
+            if question != canonical["question"] and question not in alternates:
+                alternates.append(question)
+        canonical["alternate_questions"] = alternates
+        canonical_docs.append(canonical)
+    return canonical_docs
@@ -0,0 +1,88 @@
+import base64
+import numpy as np
+
+# text-embedding-3-large
+EMBEDDING_DIMENSIONS = 3072
+EMBEDDING_BATCH_SIZE = 16
+UPLOAD_BATCH_SIZE = 100
+
+
+# Decode a base64 embedding into a float32 array. np.frombuffer is a view over the
+# decoded bytes, so no per-element Python floats are ever created.
+def decode_embedding(data):
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+# Embed a batch of texts in one request and return them as a (len(texts), dim) float32 array.
+# Asking for base64 explicitly keeps the SDK from expanding the vectors into lists of floats.
+def embed_texts(openai_client, texts, model, **kwargs):
+    resp = openai_client.embeddings.create(input=texts, model=model, encoding_format="base64", **kwargs)
+    vectors = np.empty((len(texts), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    for item in resp.data:
+        vectors[item.index] = decode_embedding(item.embedding)
+    return vectors
+
+
+# Contiguous float32 storage for embeddings. Documents keep the row number of
+# their vector and the vector is only turned into a JSON list when uploading.
+class VectorStore:
+    def __init__(self, dimensions=EMBEDDING_DIMENSIONS, capacity=1024):
+        self._vectors = np.empty((capacity, dimensions), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, row):
+        return self.vectors[row]
+
+    @property
+    def vectors(self):
+        return self._vectors[: self._size]
+
+    def _reserve(self, count):
+        if self._size + count <= len(self._vectors):
+            return
+        capacity = max(len(self._vectors) * 2, self._size + count)
+        grown = np.empty((capacity, self._vectors.shape[1]), dtype=np.float32)
+        grown[: self._size] = self.vectors
+        self._vectors = grown
+
+    # Append a (n, dim) array of vectors and return their row numbers
+    def extend(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self._vectors.shape[1])
+        self._reserve(len(vectors))
+        rows = range(self._size, self._size + len(vectors))
+        self._vectors[self._size : self._size + len(vectors)] = vectors
+        self._size += len(vectors)
+        return list(rows)
+
+
+# Serialize documents batch by batch, so only one batch of vectors exists as
+# Python lists at a time. Each doc references its vector with "vector_row".
+def iter_upload_batches(docs, store, batch_size=UPLOAD_BATCH_SIZE, skip=None):
+    for start in range(0, len(docs), batch_size):
+        if skip is not None and skip(start):
+            continue
+        batch = []
+        for doc in docs[start : start + batch_size]:
+            doc = dict(doc)
+            doc["vector"] = store[doc.pop("vector_row")].tolist()
+            batch.append(doc)
+        yield start, batch
+
+
+# Upload docs in batches. With a checkpoint journal, batches the index already
+# acknowledged are skipped and each fully acknowledged batch is recorded.
+def upload_documents(search_client, docs, store, batch_size=UPLOAD_BATCH_SIZE, journal=None):
+    uploaded = 0
+    skip = journal.is_uploaded if journal is not None else None
+    for start, batch in iter_upload_batches(docs, store, batch_size, skip):
+        results = search_client.merge_or_upload_documents(documents=batch)
+        failed = [result.key for result in results if not result.succeeded]
+        if failed:
+            raise RuntimeError(f"Indexing failed for {len(failed)} documents in batch starting at {start}: {failed[:5]}")
+        if journal is not None:
+            journal.record_uploaded(start, start + len(batch))
+        uploaded += len(batch)
+    return uploaded
@@ -0,0 +1,116 @@
+from azure.core.exceptions import ResourceNotFoundError
+from azure.search.documents.indexes.models import (
+    SearchIndex,
+    SimpleField,
+    SearchableField,
+    SearchField,
+    VectorSearch,
+    VectorSearchProfile,
+    HnswAlgorithmConfiguration,
+    SearchFieldDataType,
+    AzureOpenAIModelName,
+    AzureOpenAIVectorizer,
+    AzureOpenAIVectorizerParameters,
+    SemanticConfiguration,
+    SemanticSearch,
+    SemanticPrioritizedFields,
+    SemanticField,
+)
+from .config import PARTITION_FIELDS, SEMANTIC_CONFIG_NAME, SOURCE_FIELD, get_settings
+from .embedding_store import EMBEDDING_DIMENSIONS
+
+
+# FAQ index definition. With vectorizer=True the index embeds query text itself
+# (VectorizableTextQuery) and gets a semantic configuration, as Azure AI Foundry requires.
+# Push indexes also carry the paraphrases collapsed by dedup in "alternate_questions".
+# The partition fields are filterable so queries can be scoped before the vector search.
+# The source file is filterable so re-ingesting a file replaces only its own documents.
+def build_index(index_name, vectorizer=False, alternate_questions=True):
+    settings = get_settings()
+    fields = [
+        # Sortable and filterable so exports can page through the index by key
+        SimpleField(name="id", type=SearchFieldDataType.String, key=True, sortable=True, filterable=True),
+        SearchableField(name="question", type=SearchFieldDataType.String, searchable=True, retrievable=True),
+        SearchableField(name="answer", type=SearchFieldDataType.String, searchable=True, retrievable=True),
+    ]
+    fields.extend(
+        SimpleField(name=name, type=SearchFieldDataType.String, filterable=True, facetable=True)
+        for name in PARTITION_FIELDS
+    )
+    fields.append(SimpleField(name=SOURCE_FIELD, type=SearchFieldDataType.String, filterable=True))
+    if alternate_questions:
+        fields.append(
+            SearchableField(
+                name="alternate_questions",
+                type=SearchFieldDataType.String,
+                collection=True,
+                searchable=True,
+                retrievable=True,
+            )
+        )
+    fields.append(
+        SearchField(
+            name="vector",
+            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+            searchable=True,
+            vector_search_dimensions=EMBEDDING_DIMENSIONS,
+            vector_search_profile_name="faq-vector-config",
+        )
+    )
+
+    vector_search = VectorSearch(
+        profiles=[
+            VectorSearchProfile(
+                name="faq-vector-config",
+                algorithm_configuration_name="faq-algorithms-config",
+                vectorizer_name="faq-vectorizer" if vectorizer else None,
+            )
+        ],
+        algorithms=[HnswAlgorithmConfiguration(name="faq-algorithms-config")],
+        vectorizers=[
+            AzureOpenAIVectorizer(
+                vectorizer_name="faq-vectorizer",
+                parameters=AzureOpenAIVectorizerParameters(
+                    resource_url=settings.openai_endpoint,
+                    deployment_name=settings.embedding_name,
+                    model_name=AzureOpenAIModelName.TEXT_EMBEDDING3_LARGE,
+                    api_key=settings.openai_api_key,
+                ),
+            ),
+        ]
+        if vectorizer
+        else None,
+    )
+
+    semantic_search = None
+    if vectorizer:
+        content_fields = [SemanticField(field_name="answer")]
+        if alternate_questions:
+            content_fields.append(SemanticField(field_name="alternate_questions"))
+        semantic_search = SemanticSearch(
+            configurations=[
+                SemanticConfiguration(
+                    name=SEMANTIC_CONFIG_NAME,
+                    prioritized_fields=SemanticPrioritizedFields(
+                        title_field=SemanticField(field_name="question"),
+                        content_fields=content_fields,
+                    ),
+                )
+            ]
+        )
+
+    return SearchIndex(
+        name=index_name, fields=fields, vector_search=vector_search, semantic_search=semantic_search
+    )
+
+
+# Delete existing index if it exists before creating a new one
+def recreate_index(index_client, index):
+    try:
+        index_client.get_index(index.name)
+        print(f" '{index.name}' is already exists. Deleting it before creating a new index.")
+        index_client.delete_index(index.name)
+    except ResourceNotFoundError:
+        pass
+
+    index_client.create_or_update_index(index)
@@ -0,0 +1,177 @@
+import csv
+import os
+import time
+from .checkpoint import CheckpointJournal, document_id
+from .clients import blob_service_client, index_client, openai_client, search_client
+from .config import PARTITION_FIELDS, SOURCE_FIELD, get_settings
+from .dedup import collapse_near_duplicates, dedup_threshold
+from .embedding_store import EMBEDDING_BATCH_SIZE, UPLOAD_BATCH_SIZE, VectorStore, embed_texts, upload_documents
+from .index_schema import build_index, recreate_index
+from .snapshot import iter_documents
+
+LOCAL_FAQ_PATH = os.path.join("data", "faq.csv")
+BLOB_FAQ_NAME = "faq_blob.csv"
+
+
+# Download the FAQ data from Azure Blob Storage if it doesn't exist
+def download_blob_faq(blob_name=BLOB_FAQ_NAME):
+    faq_data_path = os.path.join("data", blob_name)
+    if not os.path.exists(faq_data_path):
+        print(f"FAQ data not found at {faq_data_path}. Downloading...")
+        blob_client = blob_service_client().get_blob_client(
+            container=get_settings().blob_container_name, blob=blob_name
+        )
+        with open(faq_data_path, "wb") as f:
+            f.write(blob_client.download_blob().readall())
+    return faq_data_path
+
+
+# Partition values set as custom metadata on the blob (e.g. tenant=contoso)
+def blob_partition_metadata(blob_name=BLOB_FAQ_NAME):
+    blob_client = blob_service_client().get_blob_client(container=get_settings().blob_container_name, blob=blob_name)
+    metadata = blob_client.get_blob_properties().metadata or {}
+    return {name: metadata[name] for name in PARTITION_FIELDS if metadata.get(name)}
+
+
+# Partition values of a row: its own CSV columns, falling back to the run's defaults
+def partition_values(row, defaults):
+    return {name: row.get(name) or defaults.get(name) for name in PARTITION_FIELDS}
+
+
+# What documents of a source file are tagged with: its name, so the same file
+# ingested from another directory or machine still replaces its own documents
+def source_key(faq_data_path):
+    return os.path.basename(faq_data_path)
+
+
+def read_rows(faq_data_path):
+    with open(faq_data_path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+# Document for the row at row_number of the source file, whose vector is row
+# vector_row of the store
+def row_document(index_name, source, row_number, row, vector_row, partition_defaults=None):
+    partition = partition_values(row, partition_defaults or {})
+    scope = "/".join([source, *(value or "" for value in partition.values())])
+    return {
+        "id": document_id(index_name, row_number, row["question"], scope),
+        "question": row["question"],
+        "answer": row["answer"],
+        **partition,
+        SOURCE_FIELD: source,
+        "vector_row": vector_row,
+    }
+
+
+# Generate embedding vectors in batches and turn rows into documents for indexing.
+# Rows embedded by an earlier run are read back from the checkpoint.
+def embed_rows(rows, store, journal, index_name, source, partition_defaults=None):
+    docs = []
+    embedding_name = get_settings().embedding_name
+    for start in range(0, len(rows), EMBEDDING_BATCH_SIZE):
+        batch = rows[start : start + EMBEDDING_BATCH_SIZE]
+        vectors = journal.load_vectors(start, len(batch))
+        if vectors is None:
+            vectors = embed_texts(openai_client(), [row["question"] for row in batch], embedding_name)
+            journal.record_embedded(start, vectors)
+        for row_number, (row, vector_row) in enumerate(zip(batch, store.extend(vectors)), start):
+            docs.append(row_document(index_name, source, row_number, row, vector_row, partition_defaults))
+    return docs
+
+
+# Collapse near-duplicate questions into one document carrying their alternate phrasings.
+# Questions of different tenants, products or languages are never merged.
+def collapse_documents(docs, store, threshold=None):
+    embedded_count = len(docs)
+    docs = collapse_near_duplicates(docs, store, threshold, group_by=PARTITION_FIELDS)
+    print(f"Collapsed {embedded_count} questions into {len(docs)} documents.")
+    return docs
+
+
+# Upload the documents; with keep_index, also remove what the source file no longer has
+def index_documents(index_name, source, docs, store, keep_index=False, journal=None):
+    uploaded = upload_documents(search_client(index_name), docs, store, journal=journal)
+    if keep_index:
+        print(f"Deleted {delete_stale_documents(index_name, source, docs)} stale documents from {source}.")
+    return uploaded
+
+
+# Delete the documents ingested from the source file earlier that docs no longer
+# contain, e.g. questions removed from a tenant's file since it was last ingested with
+# --keep-index (ids depend on the row position, so moved rows are replaced as well).
+# Documents of other files, and of ingests from before documents were tagged with
+# their file, are left alone.
+def delete_stale_documents(index_name, source, docs):
+    client = search_client(index_name)
+    index = index_client().get_index(index_name)
+    ids = {doc["id"] for doc in docs}
+    escaped = source.replace("'", "''")
+    stale = []
+    for result in iter_documents(client, index, filter=f"{SOURCE_FIELD} eq '{escaped}'", select=["id"]):
+        if result["id"] not in ids:
+            stale.append({"id": result["id"]})
+    for start in range(0, len(stale), UPLOAD_BATCH_SIZE):
+        client.delete_documents(documents=stale[start : start + UPLOAD_BATCH_SIZE])
+    return len(stale)
+
+
+# The local CSV to ingest and the partition defaults for its rows: explicit defaults
+# win over the blob's metadata
+def resolve_source(source="local", faq_data_path=None, partition_defaults=None):
+    partition_defaults = dict(partition_defaults or {})
+    if source == "blob":
+        return download_blob_faq(), {**blob_partition_metadata(), **partition_defaults}
+    return faq_data_path or LOCAL_FAQ_PATH, partition_defaults
+
+
+# Push ingestion: embed the FAQ rows ourselves and upload them with their vectors.
+# source is "local" (data/faq.csv or faq_data_path) or "blob" (downloaded from the container).
+# With vectorizer=True the index also gets a vectorizer and semantic configuration.
+# Partition fields (tenant, product, language) come from the CSV columns of the same
+# name, else from partition_defaults, else from the blob's metadata. With
+# keep_index=True the documents are added to the existing index instead of recreating
+# it, replacing those ingested earlier from a file of the same name.
+def run_ingest(source="local", vectorizer=False, faq_data_path=None, partition_defaults=None, keep_index=False):
+    index_name = get_settings().index_name
+    faq_data_path, partition_defaults = resolve_source(source, faq_data_path, partition_defaults)
+
+    # Resume a previous run that died partway from its checkpoint journal, if there is one
+    journal = CheckpointJournal(
+        f"ingest:{source}:{'vectorizer' if vectorizer else 'vector'}",
+        index_name,
+        faq_data_path,
+        {
+            "embedding_batch_size": EMBEDDING_BATCH_SIZE,
+            "upload_batch_size": UPLOAD_BATCH_SIZE,
+            "dedup_threshold": dedup_threshold(),
+            "partition_defaults": partition_defaults,
+        },
+    )
+    if journal.resuming:
+        print(
+            f"Resuming ingestion into '{index_name}' from checkpoint: "
+            f"{len(journal.embedded)} batches embedded, {len(journal.uploaded)} batches uploaded."
+        )
+    # A run can die between deleting the old index and creating the new one
+    if not journal.index_ready:
+        if keep_index:
+            index_client().create_or_update_index(build_index(index_name, vectorizer=vectorizer))
+        else:
+            recreate_index(index_client(), build_index(index_name, vectorizer=vectorizer))
+        journal.record_index_ready()
+
+    start_time = time.time()
+    # Vectors are kept in one float32 array; docs only reference their row
+    store = VectorStore()
+    source = source_key(faq_data_path)
+    docs = embed_rows(read_rows(faq_data_path), store, journal, index_name, source, partition_defaults)
+    docs = collapse_documents(docs, store)
+
+    execution_time = time.time() - start_time
+    print(f"Execution time: {execution_time:.5f} seconds")
+
+    uploaded = index_documents(index_name, source, docs, store, keep_index, journal=journal)
+    journal.complete()
+    print(f"Indexed {uploaded} documents.")
+    return uploaded
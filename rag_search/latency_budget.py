@@ -0,0 +1,194 @@
+import os
+import time
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Default per-stage latency budgets (milliseconds), overridable with
+# LATENCY_BUDGET_<STAGE>_MS. A call that is still running after its budget is
+# abandoned and the caller switches to a degraded mode.
+DEFAULT_LATENCY_BUDGET_MS = {
+    "embedding": 1500,
+    "search": 2000,
+    "semantic": 1500,
+    "chat": 20000,
+    "summary": 10000,
+}
+# A duplicate (hedged) request is sent once a call is slower than this percentile
+# of the latencies recently observed for the same stage.
+DEFAULT_HEDGE_PERCENTILE = 95
+# Until enough samples are collected, hedge after this fraction of the budget.
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_FRACTION = 0.5
+
+# Threads per stage. Each stage has its own pool, so attempts abandoned by a slow
+# backend only tie up that stage's threads, not those of every other stage.
+STAGE_POOL_WORKERS = 8
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _stage_executor(stage):
+    with _executors_lock:
+        if stage not in _executors:
+            _executors[stage] = ThreadPoolExecutor(max_workers=STAGE_POOL_WORKERS, thread_name_prefix=f"hedge-{stage}")
+        return _executors[stage]
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, stage, budget_ms):
+        super().__init__(f"{stage} exceeded its latency budget of {budget_ms:.0f} ms")
+        self.stage = stage
+        self.budget_ms = budget_ms
+
+
+# Rolling window of observed latencies per stage
+class LatencyTracker:
+    def __init__(self, window=500):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples[stage].append(seconds * 1000)
+
+    def count(self, stage, event):
+        with self._lock:
+            self._counters[stage][event] += 1
+
+    def percentile(self, stage, pct):
+        with self._lock:
+            samples = sorted(self._samples[stage])
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, round(pct / 100 * len(samples)) - 1))
+        return samples[rank]
+
+    def sample_count(self, stage):
+        with self._lock:
+            return len(self._samples[stage])
+
+    def summary(self):
+        with self._lock:
+            stages = list(dict.fromkeys([*self._samples, *self._counters]))
+            counters = {stage: dict(events) for stage, events in self._counters.items()}
+        report = {}
+        for stage in stages:
+            report[stage] = {
+                "count": self.sample_count(stage),
+                "p50_ms": self.percentile(stage, 50),
+                "p95_ms": self.percentile(stage, 95),
+                "p99_ms": self.percentile(stage, 99),
+                **counters.get(stage, {}),
+            }
+        return report
+
+
+latency_tracker = LatencyTracker()
+
+
+# Read at call time so values from .env are picked up after load_dotenv()
+def stage_budget_ms(stage):
+    return float(os.getenv(f"LATENCY_BUDGET_{stage.upper()}_MS", DEFAULT_LATENCY_BUDGET_MS[stage]))
+
+
+def _hedge_delay_ms(stage, budget_ms, tracker):
+    if tracker.sample_count(stage) < HEDGE_MIN_SAMPLES:
+        return budget_ms * HEDGE_DEFAULT_FRACTION
+    hedge_percentile = float(os.getenv("HEDGE_PERCENTILE", DEFAULT_HEDGE_PERCENTILE))
+    return min(tracker.percentile(stage, hedge_percentile), budget_ms)
+
+
+# Run fn() under the stage's latency budget. If it has not answered by the hedge
+# delay, the same call is issued once more and whichever finishes first wins.
+# Raises BudgetExceeded if neither attempt succeeds in time; the slower attempt
+# is left to finish in the background and its result is discarded.
+# The budget starts when the first attempt starts running, and an attempt that cannot
+# start within one budget (the stage's threads are all busy) counts as an overrun.
+# The first attempt's latency is recorded whenever it succeeds, also after the
+# budget, so overruns keep the hedge percentile honest.
+def hedged_call(stage, fn, budget_ms=None, tracker=latency_tracker):
+    budget_ms = stage_budget_ms(stage) if budget_ms is None else budget_ms
+    executor = _stage_executor(stage)
+    started = threading.Event()
+    started_at = []
+
+    def first_attempt():
+        started_at.append(time.perf_counter())
+        started.set()
+        return fn()
+
+    def record_first(future):
+        if not future.cancelled() and future.exception() is None:
+            tracker.record(stage, time.perf_counter() - started_at[0])
+
+    first = executor.submit(first_attempt)
+    first.add_done_callback(record_first)
+    if not started.wait(budget_ms / 1000):
+        first.cancel()
+        tracker.count(stage, "saturated")
+        tracker.count(stage, "budget_exceeded")
+        raise BudgetExceeded(stage, budget_ms)
+    start = started_at[0]
+    deadline = start + budget_ms / 1000
+    hedge_at = start + _hedge_delay_ms(stage, budget_ms, tracker) / 1000
+
+    pending = {first}
+    hedged = False
+    last_error = None
+    while pending:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        wake_at = deadline if hedged else min(hedge_at, deadline)
+        done, pending = wait(pending, timeout=max(0, wake_at - now), return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+        if not hedged and time.perf_counter() >= hedge_at:
+            # Issue the duplicate request, also after an early failure of the first one
+            hedged = True
+            tracker.count(stage, "hedged")
+            pending.add(executor.submit(fn))
+        elif not pending and not hedged:
+            hedged = True
+            tracker.count(stage, "retried")
+            pending.add(executor.submit(fn))
+
+    if last_error is not None and not pending:
+        tracker.count(stage, "failed")
+        raise last_error
+    tracker.count(stage, "budget_exceeded")
+    raise BudgetExceeded(stage, budget_ms)
+
+
+# Last good retrieval result per normalized question. Served when the retrieval
+# stages run over budget, so a slow replica degrades answers instead of failing them.
+class FallbackContextCache:
+    def __init__(self, max_entries=256):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(question):
+        return " ".join(question.lower().split())
+
+    def get(self, question):
+        with self._lock:
+            key = self._key(question)
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, question, context):
+        with self._lock:
+            key = self._key(question)
+            self._entries[key] = context
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,119 @@
+from azure.search.documents.indexes.models import (
+    InputFieldMappingEntry,
+    OutputFieldMappingEntry,
+    FieldMapping,
+    AzureOpenAIEmbeddingSkill,
+    AzureOpenAIModelName,
+    SearchIndexerSkillset,
+    SearchIndexer,
+    IndexingParameters,
+    IndexingParametersConfiguration,
+    SearchIndexerDataSourceType,
+    SearchIndexerDataContainer,
+    SearchIndexerDataSourceConnection,
+    BlobIndexerParsingMode,
+)
+from .clients import index_client, indexer_client
+from .config import PARTITION_FIELDS, get_settings
+from .embedding_store import EMBEDDING_DIMENSIONS
+from .index_schema import build_index, recreate_index
+
+DATA_SOURCE_NAME = "faq-ds"
+SKILLSET_NAME = "faq-ss"
+INDEXER_NAME = "faq-idxr"
+
+
+# Create a data source to pull data from Azure Blob Storage
+def create_data_source():
+    settings = get_settings()
+    container = SearchIndexerDataContainer(name=settings.blob_container_name)
+    data_source_connection = SearchIndexerDataSourceConnection(
+        name=DATA_SOURCE_NAME,
+        type=SearchIndexerDataSourceType.AZURE_BLOB,
+        connection_string=settings.blob_connection_string,
+        container=container,
+    )
+    data_source = indexer_client().create_or_update_data_source_connection(data_source_connection)
+    print(f"Data source '{data_source.name}' created or updated")
+    return data_source
+
+
+# Create a skillset to generate embedding vectors using Azure OpenAI
+def create_skillset():
+    settings = get_settings()
+    embedding_skill = AzureOpenAIEmbeddingSkill(
+        description="Skill to generate embeddings via Azure OpenAI",
+        resource_url=settings.openai_endpoint,
+        api_key=settings.openai_api_key,
+        deployment_name=settings.embedding_name,
+        model_name=AzureOpenAIModelName.TEXT_EMBEDDING3_LARGE,
+        dimensions=EMBEDDING_DIMENSIONS,
+        inputs=[
+            InputFieldMappingEntry(name="text", source="/document/question"),
+        ],
+        outputs=[OutputFieldMappingEntry(name="embedding", target_name="emb_vector")],
+    )
+
+    skillset = SearchIndexerSkillset(
+        name=SKILLSET_NAME,
+        description="Skillset to chunk documents and generating embeddings",
+        skills=[embedding_skill],
+    )
+    indexer_client().create_or_update_skillset(skillset)
+    print(f"{skillset.name} created")
+    return skillset
+
+
+# If using the index created with the Pull method, configure the indexer
+def create_indexer(index_name, data_source_name):
+    indexer_parameters_config = IndexingParametersConfiguration(
+        parsing_mode=BlobIndexerParsingMode.DELIMITED_TEXT,
+        first_line_contains_headers=True,
+        delimited_text_delimiter=",",
+        # To resolve the issue: Configuration property 'queryTimeout' is not supported for the data source of type 'azureblob'.
+        # https://github.com/Azure/azure-sdk-for-python/issues/33382
+        query_timeout=None,
+    )
+
+    indexer = SearchIndexer(
+        name=INDEXER_NAME,
+        description="Indexer to index documents and generate embeddings",
+        skillset_name=SKILLSET_NAME,
+        target_index_name=index_name,
+        data_source_name=data_source_name,
+        parameters=IndexingParameters(configuration=indexer_parameters_config),
+        # Field mappings for the indexer
+        field_mappings=[
+            FieldMapping(
+                # !important: Do not use '/document' prefix to indicate the source field
+                source_field_name="question",
+                target_field_name="question",
+            ),
+            FieldMapping(source_field_name="answer", target_field_name="answer"),
+            # Partition fields come from CSV columns, or from custom blob metadata of the same name
+            *(FieldMapping(source_field_name=name, target_field_name=name) for name in PARTITION_FIELDS),
+        ],
+        # Map output fields for embedding vectors to index fields
+        output_field_mappings=[
+            FieldMapping(
+                # sourceFieldName is an invalid path: path must begin with '/document'
+                source_field_name="/document/emb_vector/*",
+                target_field_name="vector",
+            )
+        ],
+    )
+
+    indexer_result = indexer_client().create_or_update_indexer(indexer)
+    print(f"Indexer '{indexer_result.name}' created or updated")
+    return indexer_result
+
+
+# Pull ingestion: the Azure AI Search indexer reads the CSV from Blob Storage and
+# embeds it with a skillset. With vectorizer=True the index also gets a vectorizer
+# and semantic configuration.
+def run_pull(vectorizer=False):
+    index_name = get_settings().pull_index_name
+    recreate_index(index_client(), build_index(index_name, vectorizer=vectorizer, alternate_questions=False))
+    data_source = create_data_source()
+    create_skillset()
+    return create_indexer(index_name, data_source.name)
@@ -0,0 +1,350 @@
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+import numpy as np
+from .checkpoint import CHECKPOINT_DIR, file_sha256
+from .clients import index_client, openai_client
+from .coalescing import normalize_question
+from .config import get_settings
+from .dedup import dedup_threshold
+from .embedding_store import EMBEDDING_BATCH_SIZE, EMBEDDING_DIMENSIONS, VectorStore, embed_texts
+from .index_schema import build_index, recreate_index
+from .ingest import (
+    collapse_documents,
+    download_blob_faq,
+    index_documents,
+    read_rows,
+    resolve_source,
+    row_document,
+    source_key,
+)
+
+DEFAULT_INGEST_WORKERS = 4
+# Shards per worker: smaller shards balance better and lose less work on a retry
+SHARDS_PER_WORKER = 4
+# A claimed shard is handed to another worker if its worker stops renewing the lease
+# (crashed, killed, lost its machine)
+SHARD_LEASE_SECONDS = 60
+MAX_SHARD_ATTEMPTS = 3
+POLL_SECONDS = 2
+
+
+def default_queue_path(index_name):
+    return os.path.join(CHECKPOINT_DIR, f"{index_name}.shards.sqlite")
+
+
+# Workers save each shard's vectors here, next to the queue, for the coordinator
+def vectors_dir(queue_path):
+    return os.path.splitext(queue_path)[0] + ".vectors"
+
+
+# Rows are sharded by a hash of the normalized question rather than by byte range,
+# since quoted answers may span lines.
+def shard_of(question, num_shards):
+    return zlib.crc32(normalize_question(question).encode("utf-8")) % num_shards
+
+
+# Work queue of an ingest job in a SQLite file. Workers on this or other machines
+# (sharing the file over a filesystem with working locks) claim shards with a lease,
+# renew it while they work, and mark them done or failed. Failed and abandoned shards
+# go back to the queue until they have been tried MAX_SHARD_ATTEMPTS times.
+class ShardQueue:
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+
+    @classmethod
+    def create(cls, path, job):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+        queue = cls(path)
+        with queue._transaction() as db:
+            db.execute("CREATE TABLE job (spec TEXT NOT NULL)")
+            db.execute(
+                "CREATE TABLE shards (shard INTEGER PRIMARY KEY, status TEXT NOT NULL, attempts INTEGER NOT NULL, "
+                "worker TEXT, lease_expires REAL, documents INTEGER, error TEXT)"
+            )
+            db.execute("INSERT INTO job VALUES (?)", (json.dumps(job),))
+            db.executemany(
+                "INSERT INTO shards (shard, status, attempts) VALUES (?, 'pending', 0)",
+                [(shard,) for shard in range(job["num_shards"])],
+            )
+        return queue
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two workers never claim the same shard
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def job(self):
+        return json.loads(self._db.execute("SELECT spec FROM job").fetchone()[0])
+
+    # Claim the next shard for worker; None if none is claimable right now
+    def claim(self, worker, lease_seconds=SHARD_LEASE_SECONDS):
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = 'lease expired on ' || worker WHERE status = 'running' AND lease_expires < ?",
+                (MAX_SHARD_ATTEMPTS, now),
+            )
+            row = db.execute("SELECT shard FROM shards WHERE status = 'pending' ORDER BY shard LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE shards SET status = 'running', attempts = attempts + 1, worker = ?, lease_expires = ? "
+                "WHERE shard = ?",
+                (worker, now + lease_seconds, row[0]),
+            )
+        return row[0]
+
+    def renew(self, shard, worker, lease_seconds=SHARD_LEASE_SECONDS):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE shards SET lease_expires = ? WHERE shard = ? AND worker = ? AND status = 'running'",
+                (time.time() + lease_seconds, shard, worker),
+            )
+
+    def complete(self, shard, worker, documents):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE shards SET status = 'done', documents = ?, error = NULL WHERE shard = ? AND worker = ?",
+                (documents, shard, worker),
+            )
+
+    def fail(self, shard, worker, error):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ? "
+                "WHERE shard = ? AND worker = ?",
+                (MAX_SHARD_ATTEMPTS, error, shard, worker),
+            )
+
+    # Give shards that ran out of attempts in an earlier run a fresh set
+    def retry_failed(self):
+        with self._transaction() as db:
+            db.execute("UPDATE shards SET status = 'pending', attempts = 0 WHERE status = 'failed'")
+
+    def counts(self):
+        counts = dict.fromkeys(("pending", "running", "done", "failed"), 0)
+        counts.update(self._db.execute("SELECT status, COUNT(*) FROM shards GROUP BY status").fetchall())
+        return counts
+
+    def documents(self):
+        return self._db.execute("SELECT COALESCE(SUM(documents), 0) FROM shards WHERE status = 'done'").fetchone()[0]
+
+    def errors(self):
+        return self._db.execute("SELECT shard, error FROM shards WHERE status = 'failed' ORDER BY shard").fetchall()
+
+    def close(self):
+        self._db.close()
+
+
+# Renew a shard's lease in the background while the worker embeds it
+@contextmanager
+def _lease(queue_path, shard, worker):
+    stop = threading.Event()
+
+    def renew():
+        queue = ShardQueue(queue_path)
+        try:
+            while not stop.wait(SHARD_LEASE_SECONDS / 3):
+                queue.renew(shard, worker)
+        finally:
+            queue.close()
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+# Embed the rows of one shard and save their vectors with their row numbers. Saved
+# with an atomic rename, so a retried shard simply replaces the file.
+def embed_shard(shard, numbered_rows, directory):
+    row_numbers = np.array([row_number for row_number, _ in numbered_rows], dtype=np.int64)
+    vectors = np.empty((len(numbered_rows), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    embedding_name = get_settings().embedding_name
+    for start in range(0, len(numbered_rows), EMBEDDING_BATCH_SIZE):
+        batch = [row["question"] for _, row in numbered_rows[start : start + EMBEDDING_BATCH_SIZE]]
+        vectors[start : start + len(batch)] = embed_texts(openai_client(), batch, embedding_name)
+
+    path = os.path.join(directory, f"shard_{shard:05d}.npz")
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, rows=row_numbers, vectors=vectors)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+    return len(numbered_rows)
+
+
+# Vectors of every row of the source, in file order, from the shard files
+def load_shard_vectors(directory, num_shards, num_rows):
+    store = VectorStore(capacity=max(num_rows, 1))
+    vectors = np.zeros((num_rows, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    found = np.zeros(num_rows, dtype=bool)
+    for shard in range(num_shards):
+        with np.load(os.path.join(directory, f"shard_{shard:05d}.npz")) as saved:
+            vectors[saved["rows"]] = saved["vectors"]
+            found[saved["rows"]] = True
+    if not found.all():
+        raise RuntimeError(f"{int((~found).sum())} rows have no vector in {directory}")
+    store.extend(vectors)
+    return store
+
+
+# Worker loop: claim shards from the queue and embed them until every shard is done
+# or failed. faq_data_path overrides where the job's CSV is on this machine; it must
+# be the same file. While other workers hold shards, it waits in case their leases expire.
+def run_worker(queue_path, faq_data_path=None, worker=None):
+    if not os.path.exists(queue_path):
+        print(f"No shard queue at {queue_path}.")
+        return 1
+    queue = ShardQueue(queue_path)
+    job = queue.job()
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    faq_data_path = download_blob_faq() if job["source"] == "blob" else faq_data_path or job["path"]
+    if file_sha256(faq_data_path) != job["source_sha256"]:
+        print(f"{faq_data_path} is not the file this ingest job was started with.")
+        return 1
+
+    shards = {}
+    for row_number, row in enumerate(read_rows(faq_data_path)):
+        shards.setdefault(shard_of(row["question"], job["num_shards"]), []).append((row_number, row))
+    directory = vectors_dir(queue_path)
+    os.makedirs(directory, exist_ok=True)
+
+    while True:
+        shard = queue.claim(worker)
+        if shard is None:
+            if queue.counts()["running"] == 0:
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+        start_time = time.time()
+        try:
+            with _lease(queue_path, shard, worker):
+                embedded = embed_shard(shard, shards.get(shard, []), directory)
+        except Exception as ex:
+            print(f"[{worker}] Shard {shard} failed:", ex)
+            queue.fail(shard, worker, repr(ex))
+        else:
+            queue.complete(shard, worker, embedded)
+            print(f"[{worker}] Shard {shard}: {embedded} rows embedded in {time.time() - start_time:.1f} seconds.")
+    queue.close()
+    return 0
+
+
+def _spawn_worker(queue_path):
+    return subprocess.Popen([sys.executable, "-m", "rag_search", "ingest-worker", "--queue", queue_path])
+
+
+# Sharded push ingestion: split the CSV into hash shards, put them in a queue and
+# run `workers` worker processes over it to embed them. More workers can join from
+# other machines with `rag-search ingest-worker --queue PATH`. Once every shard is
+# embedded, dedup and upload run here over all rows at once, so the index is the
+# same as after an unsharded run. A rerun with the same file and settings resumes
+# the queue (and retries failed shards) instead of starting over.
+def run_sharded_ingest(
+    source="local",
+    vectorizer=False,
+    faq_data_path=None,
+    partition_defaults=None,
+    keep_index=False,
+    workers=DEFAULT_INGEST_WORKERS,
+    shards=None,
+    queue_path=None,
+):
+    index_name = get_settings().index_name
+    faq_data_path, partition_defaults = resolve_source(source, faq_data_path, partition_defaults)
+    queue_path = queue_path or default_queue_path(index_name)
+    job = {
+        "index": index_name,
+        "source": source,
+        "path": os.path.abspath(faq_data_path),
+        "source_sha256": file_sha256(faq_data_path),
+        "num_shards": shards or max(workers, 1) * SHARDS_PER_WORKER,
+        "vectorizer": vectorizer,
+        "partition_defaults": partition_defaults,
+        "dedup_threshold": dedup_threshold(),
+    }
+
+    queue = None
+    if os.path.exists(queue_path):
+        queue = ShardQueue(queue_path)
+        if queue.job() == job:
+            queue.retry_failed()
+            print(f"Resuming sharded ingestion into '{index_name}': {queue.counts()['done']} of {job['num_shards']} shards done.")
+        else:
+            queue.close()
+            queue = None
+    if queue is None:
+        if keep_index:
+            index_client().create_or_update_index(build_index(index_name, vectorizer=vectorizer))
+        else:
+            recreate_index(index_client(), build_index(index_name, vectorizer=vectorizer))
+        shutil.rmtree(vectors_dir(queue_path), ignore_errors=True)
+        queue = ShardQueue.create(queue_path, job)
+
+    start_time = time.time()
+    processes = [_spawn_worker(queue_path) for _ in range(workers)]
+    print(f"Embedding {job['num_shards']} shards with {workers} workers (queue: {queue_path}).")
+    last_counts = None
+    while True:
+        counts = queue.counts()
+        if counts != last_counts:
+            print(f"Shards: {counts['done']} done, {counts['running']} running, {counts['pending']} pending, {counts['failed']} failed")
+            last_counts = counts
+        if counts["pending"] + counts["running"] == 0:
+            break
+        # Without local workers left, wait for workers on other machines
+        if processes and all(process.poll() is not None for process in processes):
+            break
+        time.sleep(POLL_SECONDS)
+    for process in processes:
+        process.wait()
+
+    counts = queue.counts()
+    if counts["done"] < job["num_shards"]:
+        for shard, error in queue.errors():
+            print(f"Shard {shard} failed: {error}")
+        print(f"{job['num_shards'] - counts['done']} shards not embedded; run the same command again to retry them.")
+        queue.close()
+        return 1
+    embedded = queue.documents()
+    execution_time = time.time() - start_time
+    print(f"Embedded {embedded} rows in {execution_time:.1f} seconds ({embedded / execution_time:.1f} rows/s).")
+
+    rows = read_rows(faq_data_path)
+    store = load_shard_vectors(vectors_dir(queue_path), job["num_shards"], len(rows))
+    source = source_key(faq_data_path)
+    docs = [
+        row_document(index_name, source, row_number, row, row_number, partition_defaults)
+        for row_number, row in enumerate(rows)
+    ]
+    docs = collapse_documents(docs, store, job["dedup_threshold"])
+    uploaded = index_documents(index_name, source, docs, store, keep_index)
+    print(f"Indexed {uploaded} documents.")
+
+    queue.close()
+    os.remove(queue_path)
+    shutil.rmtree(vectors_dir(queue_path), ignore_errors=True)
+    return 0
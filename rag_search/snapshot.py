@@ -0,0 +1,124 @@
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
+from .clients import index_client, search_client
+from .embedding_store import UPLOAD_BATCH_SIZE, VectorStore, iter_upload_batches
+from .index_schema import build_index, recreate_index
+
+SNAPSHOT_FORMAT_VERSION = 1
+VECTOR_FIELD = "vector"
+UPLOAD_WORKERS = 4
+EXPORT_PAGE_SIZE = 1000
+
+
+# Copy every document of an index, vectors included, into an .npz file: the vectors
+# as one float32 (n, dim) array and the other fields as JSON. Restoring it costs no
+# embedding calls. Documents are read in key order, one page at a time, each page
+# starting after the last key of the previous one, since the service will not skip
+# past 100,000 results of a single query.
+def export_snapshot(index_name, path):
+    start_time = time.time()
+    index = index_client().get_index(index_name)
+    store = VectorStore()
+    docs = []
+    for result in iter_documents(search_client(index_name), index):
+        doc = {key: value for key, value in result.items() if not key.startswith("@")}
+        vector = doc.pop(VECTOR_FIELD, None)
+        if vector is None:
+            raise ValueError(f"Document '{doc.get('id')}' has no '{VECTOR_FIELD}'; is the field retrievable?")
+        (doc["vector_row"],) = store.extend(vector)
+        docs.append(doc)
+
+    metadata = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "index_name": index_name,
+        "vectorizer": bool(index.vector_search and index.vector_search.vectorizers),
+        "fields": [field.name for field in index.fields],
+    }
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            vectors=store.vectors,
+            documents=np.frombuffer(json.dumps(docs).encode("utf-8"), dtype=np.uint8),
+            metadata=np.frombuffer(json.dumps(metadata).encode("utf-8"), dtype=np.uint8),
+        )
+    print(f"Exported {len(docs)} documents from '{index_name}' to {path} in {time.time() - start_time:.2f} seconds.")
+    return len(docs)
+
+
+# Every document of an index matching filter (all by default), paged by key.
+# select limits the fields returned; the key is always included.
+def iter_documents(client, index, filter=None, select=None):
+    key_field = next(field for field in index.fields if field.key)
+    select = select and list(dict.fromkeys([key_field.name, *select]))
+    if not (key_field.sortable and key_field.filterable):
+        # Indexes created before the key was sortable: one query, capped by the service
+        print(f"'{key_field.name}' is not sortable and filterable; only the first 100,000 documents can be read.")
+        yield from client.search(search_text="*", filter=filter, select=select)
+        return
+    last_key = None
+    while True:
+        clauses = [f"({filter})"] if filter else []
+        if last_key is not None:
+            escaped = last_key.replace("'", "''")
+            clauses.append(f"{key_field.name} gt '{escaped}'")
+        page = list(
+            client.search(
+                search_text="*",
+                filter=" and ".join(clauses) or None,
+                select=select,
+                order_by=[key_field.name],
+                top=EXPORT_PAGE_SIZE,
+            )
+        )
+        yield from page
+        if len(page) < EXPORT_PAGE_SIZE:
+            return
+        last_key = page[-1][key_field.name]
+
+
+def load_snapshot(path):
+    with np.load(path) as snapshot:
+        metadata = json.loads(snapshot["metadata"].tobytes())
+        if metadata["format_version"] != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {metadata['format_version']}")
+        docs = json.loads(snapshot["documents"].tobytes())
+        store = VectorStore(dimensions=snapshot["vectors"].shape[1], capacity=max(len(docs), 1))
+        store.extend(snapshot["vectors"])
+    return metadata, docs, store
+
+
+def _upload_batch(client, start, batch):
+    results = client.upload_documents(documents=batch)
+    failed = [result.key for result in results if not result.succeeded]
+    if failed:
+        raise RuntimeError(f"Indexing failed for {len(failed)} documents in batch starting at {start}: {failed[:5]}")
+    return len(batch)
+
+
+# Recreate an index from a snapshot and bulk-load it with parallel batched uploads.
+# The schema comes from build_index(); vectorizer defaults to what the exported index had.
+def restore_snapshot(path, index_name=None, vectorizer=None, workers=UPLOAD_WORKERS):
+    start_time = time.time()
+    metadata, docs, store = load_snapshot(path)
+    index_name = index_name or metadata["index_name"]
+    vectorizer = metadata["vectorizer"] if vectorizer is None else vectorizer
+    recreate_index(
+        index_client(),
+        build_index(index_name, vectorizer=vectorizer, alternate_questions="alternate_questions" in metadata["fields"]),
+    )
+
+    client = search_client(index_name)
+    uploaded = 0
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start, batch in iter_upload_batches(docs, store, UPLOAD_BATCH_SIZE):
+            # Bound the batches serialized ahead of the uploads
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                uploaded += sum(future.result() for future in done)
+            pending.add(executor.submit(_upload_batch, client, start, batch))
+        uploaded += sum(future.result() for future in wait(pending).done)
+    print(f"Restored {uploaded} documents into '{index_name}' in {time.time() - start_time:.2f} seconds.")
+    return uploaded
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from .chat import answer, embedding_cache
+from .clients import openai_client
+from .coalescing import normalize_question
+from .config import get_settings
+
+# Questions that start a conversation can be logged (QUESTION_LOG_PATH, off by
+# default) and the most frequent ones pre-answered on the next start (WARMUP_TOP_N,
+# off by default). The log is rotated to <path>.1 once it passes the size cap, so
+# at most two files are kept and read.
+DEFAULT_QUESTION_LOG_MAX_BYTES = 5 * 2**20
+DEFAULT_WARMUP_TOP_N = 0
+WARMUP_WORKERS = 4
+
+_log_lock = threading.Lock()
+
+
+def question_log_path():
+    return os.getenv("QUESTION_LOG_PATH", "")
+
+
+def question_log_max_bytes():
+    return int(os.getenv("QUESTION_LOG_MAX_BYTES", DEFAULT_QUESTION_LOG_MAX_BYTES))
+
+
+def warmup_top_n():
+    return int(os.getenv("WARMUP_TOP_N", DEFAULT_WARMUP_TOP_N))
+
+
+# Append a question to the log as a JSON line, if QUESTION_LOG_PATH is set
+def log_question(question):
+    path = question_log_path()
+    if not path:
+        return
+    line = json.dumps({"time": datetime.now(timezone.utc).isoformat(), "question": question})
+    with _log_lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) >= question_log_max_bytes():
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# The n most asked questions in the log (and its rotated part), each in its most common wording
+def top_questions(n, path=None):
+    path = path or question_log_path()
+    if not path:
+        return []
+    counts = Counter()
+    wordings = {}
+    for log_path in (path + ".1", path):
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    question = json.loads(line)["question"]
+                except (ValueError, KeyError, TypeError):
+                    # A line torn by a crash, or not written by log_question
+                    continue
+                key = normalize_question(question)
+                if key:
+                    counts[key] += 1
+                    wordings.setdefault(key, Counter())[question.strip()] += 1
+    return [wordings[key].most_common(1)[0][0] for key, _ in counts.most_common(n)]
+
+
+# Pre-embed and pre-answer the top_n most asked questions from the log, so the first
+# users after a start hit the caches instead of all missing at once. The answers go
+# through chat.answer(), so a user asking one of them meanwhile joins that request.
+# The retrieval options must be the ones the chat uses, or the cached answers won't match.
+# The caches live in the process, so this is for a long-lived server, not a one-off REPL.
+def warm_cache(top_n=None, vectorizer=False, index_names=None, hybrid=False, filters=None, workers=WARMUP_WORKERS):
+    top_n = warmup_top_n() if top_n is None else top_n
+    questions = top_questions(top_n) if top_n > 0 else []
+    if not questions:
+        return 0
+    start_time = time.time()
+    # NumPy is only needed here, so it stays out of the chat's startup
+    from .embedding_store import EMBEDDING_BATCH_SIZE, embed_texts
+
+    # With a vectorizer the index embeds the question itself
+    if not vectorizer:
+        try:
+            for start in range(0, len(questions), EMBEDDING_BATCH_SIZE):
+                batch = questions[start : start + EMBEDDING_BATCH_SIZE]
+                vectors = embed_texts(openai_client(), batch, get_settings().embedding_name)
+                for question, vector in zip(batch, vectors):
+                    embedding_cache.put(normalize_question(question), vector.tolist())
+        except Exception as ex:
+            print("Warm-up: pre-embedding failed:", ex)
+
+    answered = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup") as executor:
+        futures = [
+            executor.submit(
+                answer, question, vectorizer=vectorizer, index_names=index_names, hybrid=hybrid, filters=filters
+            )
+            for question in questions
+        ]
+        for question, future in zip(questions, futures):
+            try:
+                future.result()
+                answered += 1
+            except Exception as ex:
+                print(f"Warm-up: answering '{question}' failed:", ex)
+    print(f"Warm-up: pre-answered {answered} of {len(questions)} frequent questions in {time.time() - start_time:.2f} seconds.")
+    return answered
@@ -0,0 +1,19 @@
+import pytest
+from rag_search.chat import ranking_ambiguity
+
+
+def _docs(*scores):
+    return [{"@search.score": score} for score in scores]
+
+
+def test_ambiguity_from_the_gap_between_the_top_two_scores(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_RERANK_MARGIN", "0.1")
+    assert ranking_ambiguity(_docs(1.0, 1.0)) == 1.0
+    assert ranking_ambiguity(_docs(1.0, 0.95)) == pytest.approx(0.5)
+    assert ranking_ambiguity(_docs(1.0, 0.5)) == 0.0
+    assert ranking_ambiguity(_docs(1.0)) == 0.0
+
+
+def test_zero_margin_turns_reranking_off(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_RERANK_MARGIN", "0")
+    assert ranking_ambiguity(_docs(1.0, 1.0)) == 0.0
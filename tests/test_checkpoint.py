@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from rag_search.checkpoint import CheckpointJournal
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "faq.csv"
+    path.write_text("question,answer\nQ?,A\n", encoding="utf-8")
+    return str(path)
+
+
+def _journal(source, tmp_path, settings=None):
+    return CheckpointJournal("ingest:local:vector", "faq", source, settings or {"batch": 2}, directory=str(tmp_path / "ckpt"))
+
+
+def test_new_journal_does_not_resume(source, tmp_path):
+    journal = _journal(source, tmp_path)
+    assert not journal.resuming
+    assert not journal.index_ready
+
+
+def test_resume_restores_index_vectors_and_uploads(source, tmp_path):
+    journal = _journal(source, tmp_path)
+    journal.record_index_ready()
+    journal.record_embedded(0, np.ones((2, 3), dtype=np.float32))
+    journal.record_uploaded(0, 2)
+
+    resumed = _journal(source, tmp_path)
+    assert resumed.resuming
+    assert resumed.index_ready
+    assert resumed.load_vectors(0, 2).tolist() == [[1.0] * 3] * 2
+    # Only the exact batch that was embedded is reused
+    assert resumed.load_vectors(0, 3) is None
+    assert resumed.load_vectors(2, 2) is None
+    assert resumed.is_uploaded(0)
+    assert not resumed.is_uploaded(2)
+
+
+def test_run_that_died_before_creating_the_index_creates_it_again(source, tmp_path):
+    _journal(source, tmp_path)
+    resumed = _journal(source, tmp_path)
+    assert resumed.resuming
+    assert not resumed.index_ready
+
+
+def test_changed_settings_or_source_start_over(source, tmp_path):
+    journal = _journal(source, tmp_path)
+    journal.record_index_ready()
+    journal.record_embedded(0, np.ones((2, 3), dtype=np.float32))
+
+    restarted = _journal(source, tmp_path, settings={"batch": 4})
+    assert not restarted.resuming
+    assert not restarted.index_ready
+    assert restarted.embedded == {}
+
+    with open(source, "a", encoding="utf-8") as f:
+        f.write("Q2?,A2\n")
+    assert not _journal(source, tmp_path, settings={"batch": 4}).resuming
+
+
+def test_torn_last_line_is_dropped(source, tmp_path):
+    journal = _journal(source, tmp_path)
+    journal.record_index_ready()
+    journal.record_embedded(0, np.ones((2, 3), dtype=np.float32))
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"event": "uploaded", "sta')
+
+    resumed = _journal(source, tmp_path)
+    assert resumed.resuming
+    assert resumed.load_vectors(0, 2) is not None
+    assert not resumed.is_uploaded(0)
+    resumed.record_uploaded(0, 2)
+    assert _journal(source, tmp_path).is_uploaded(0)
+
+
+def test_complete_removes_the_checkpoint(source, tmp_path):
+    journal = _journal(source, tmp_path)
+    journal.record_index_ready()
+    journal.complete()
+    assert not _journal(source, tmp_path).resuming
@@ -0,0 +1,102 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from rag_search import coalescing
+from rag_search.coalescing import ExpiringCache, SingleFlight, normalize_question
+
+CALLERS = 5
+
+
+def _run_concurrently(flight, fn):
+    started = threading.Event()
+    release = threading.Event()
+
+    def leader_fn():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        leader = executor.submit(flight.do, "key", leader_fn)
+        assert started.wait(5)
+        followers = [executor.submit(flight.do, "key", leader_fn) for _ in range(CALLERS - 1)]
+        # Give the followers time to join the running call
+        time.sleep(0.2)
+        release.set()
+        return leader, followers
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return "answer"
+
+    leader, followers = _run_concurrently(flight, fn)
+    assert leader.result() == ("answer", False)
+    assert [follower.result() for follower in followers] == [("answer", True)] * (CALLERS - 1)
+    assert len(calls) == 1
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+
+    def fn():
+        raise RuntimeError("search failed")
+
+    leader, followers = _run_concurrently(flight, fn)
+    for future in [leader, *followers]:
+        with pytest.raises(RuntimeError, match="search failed"):
+            future.result()
+
+
+def test_key_is_released_after_success_and_failure():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+
+    def fail():
+        raise ValueError("no answer")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 3) == (3, False)
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(coalescing.time, "monotonic", lambda: now[0])
+    cache = ExpiringCache()
+    cache.put("short", 1, ttl_seconds=10)
+    cache.put("forever", 2)
+    now[0] += 5
+    assert cache.get("short") == 1
+    now[0] += 6
+    assert cache.get("short") is None
+    assert cache.get("forever") == 2
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ExpiringCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_non_positive_ttl_stores_nothing():
+    cache = ExpiringCache()
+    cache.put("zero", 1, ttl_seconds=0)
+    cache.put("negative", 1, ttl_seconds=-1)
+    assert cache.get("zero") is None
+    assert len(cache) == 0
+
+
+def test_questions_differing_in_case_and_spacing_are_the_same():
+    assert normalize_question("How do I  reset my Password?") == normalize_question("how do i reset my password?")
@@ -0,0 +1,54 @@
+import numpy as np
+from rag_search.dedup import cluster_near_duplicates, collapse_near_duplicates
+from rag_search.embedding_store import VectorStore
+
+
+def _docs(rows):
+    store = VectorStore(dimensions=2, capacity=len(rows))
+    docs = []
+    for question, answer, vector in rows:
+        (vector_row,) = store.extend(np.array(vector, dtype=np.float32))
+        docs.append({"question": question, "answer": answer, "vector_row": vector_row})
+    return docs, store
+
+
+def test_paraphrases_with_the_same_answer_are_collapsed():
+    docs, store = _docs(
+        [
+            ("How do I reset my password?", "Use the reset link.", [1, 0]),
+            ("How can I reset my password?", "use the  reset link.", [1, 0.01]),
+        ]
+    )
+    (doc,) = collapse_near_duplicates(docs, store, threshold=0.95)
+    assert doc["question"] == "How do I reset my password?"
+    assert doc["alternate_questions"] == ["How can I reset my password?"]
+
+
+def test_similar_questions_with_different_answers_are_kept():
+    docs, store = _docs(
+        [
+            ("Reset my password on iOS?", "Settings > Account on the iOS app.", [1, 0]),
+            ("Reset my password on Android?", "Menu > Account on the Android app.", [1, 0.01]),
+        ]
+    )
+    collapsed = collapse_near_duplicates(docs, store, threshold=0.95)
+    assert [doc["answer"] for doc in collapsed] == [doc["answer"] for doc in docs]
+    assert all(doc["alternate_questions"] == [] for doc in collapsed)
+
+
+def test_clusters_do_not_chain():
+    angle = np.radians(15)
+    vectors = np.array([[1, 0], [np.cos(angle), np.sin(angle)], [np.cos(2 * angle), np.sin(2 * angle)]])
+    # sim(0, 1) = sim(1, 2) = cos 15° ≈ 0.966, sim(0, 2) = cos 30° ≈ 0.866
+    assert cluster_near_duplicates(vectors, threshold=0.95) == [[0, 1], [2]]
+
+
+def test_group_by_fields_are_never_merged():
+    docs, store = _docs(
+        [
+            ("How do I reset my password?", "Use the reset link.", [1, 0]),
+            ("How do I reset my password?", "Use the reset link.", [1, 0]),
+        ]
+    )
+    docs[0]["tenant"], docs[1]["tenant"] = "contoso", "fabrikam"
+    assert len(collapse_near_duplicates(docs, store, threshold=0.95, group_by=("tenant",))) == 2
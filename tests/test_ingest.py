@@ -0,0 +1,46 @@
+import types
+from rag_search import ingest
+
+
+class FakeSearchClient:
+    def __init__(self, docs):
+        self.docs = docs
+        self.deleted = []
+
+    def search(self, search_text, filter=None, select=None, order_by=None, top=None):
+        # Only the source filter, on a single page
+        source = filter.split(" eq ")[1].strip("'").replace("''", "'")
+        return [{"id": doc["id"]} for doc in self.docs if doc.get("source_file") == source]
+
+    def delete_documents(self, documents):
+        self.deleted.extend(doc["id"] for doc in documents)
+
+
+def _rows(*questions):
+    return [{"question": question, "answer": "A"} for question in questions]
+
+
+def _ingested(index_name, source, rows):
+    return [ingest.row_document(index_name, source, i, row, i) for i, row in enumerate(rows)]
+
+
+def test_stale_documents_are_only_deleted_from_the_same_file(monkeypatch):
+    first = _ingested("faq", "first.csv", _rows("Q1?", "Q2?"))
+    second = _ingested("faq", "second.csv", _rows("Q1?", "Q3?"))
+    legacy = {"id": "legacy"}
+    client = FakeSearchClient(first + second + [legacy])
+    index = types.SimpleNamespace(fields=[types.SimpleNamespace(name="id", key=True, sortable=False, filterable=False)])
+    monkeypatch.setattr(ingest, "search_client", lambda name: client)
+    monkeypatch.setattr(ingest, "index_client", lambda: types.SimpleNamespace(get_index=lambda name: index))
+
+    # second.csv re-ingested without Q3; no partition values on any of the files
+    reingested = _ingested("faq", "second.csv", _rows("Q1?"))
+    assert ingest.delete_stale_documents("faq", "second.csv", reingested) == 1
+    assert client.deleted == [second[1]["id"]]
+
+
+def test_same_row_of_different_files_gets_different_ids():
+    (first,) = _ingested("faq", "first.csv", _rows("Q1?"))
+    (second,) = _ingested("faq", "second.csv", _rows("Q1?"))
+    assert first["id"] != second["id"]
+    assert second["source_file"] == "second.csv"
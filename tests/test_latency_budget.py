@@ -0,0 +1,86 @@
+import threading
+import time
+import pytest
+from rag_search.latency_budget import STAGE_POOL_WORKERS, BudgetExceeded, LatencyTracker, hedged_call
+
+
+def test_returns_result_and_records_latency():
+    tracker = LatencyTracker()
+    assert hedged_call("fast", lambda: 42, budget_ms=1000, tracker=tracker) == 42
+    time.sleep(0.05)
+    assert tracker.sample_count("fast") == 1
+
+
+def test_slow_first_attempt_is_hedged():
+    tracker = LatencyTracker()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.9)
+            return "slow"
+        return "fast"
+
+    assert hedged_call("hedge", fn, budget_ms=1000, tracker=tracker) == "fast"
+    assert tracker.summary()["hedge"]["hedged"] == 1
+
+
+def test_early_failure_is_retried():
+    tracker = LatencyTracker()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert hedged_call("retry", fn, budget_ms=1000, tracker=tracker) == "ok"
+    assert tracker.summary()["retry"]["retried"] == 1
+
+
+def test_overrun_raises_and_is_recorded_when_the_attempt_finishes():
+    tracker = LatencyTracker()
+    start = time.perf_counter()
+    with pytest.raises(BudgetExceeded):
+        hedged_call("overrun", lambda: time.sleep(0.3), budget_ms=100, tracker=tracker)
+    assert time.perf_counter() - start < 0.25
+    assert tracker.summary()["overrun"]["budget_exceeded"] == 1
+
+    time.sleep(0.4)
+    # The first attempt's latency counts, not just the calls that made it in time
+    assert tracker.sample_count("overrun") == 1
+    assert tracker.percentile("overrun", 50) >= 300
+
+
+def test_abandoned_attempts_do_not_starve_other_stages():
+    tracker = LatencyTracker()
+    release = threading.Event()
+    for _ in range(STAGE_POOL_WORKERS):
+        with pytest.raises(BudgetExceeded):
+            hedged_call("stuck", release.wait, budget_ms=20, tracker=tracker)
+    try:
+        assert hedged_call("healthy", lambda: 1, budget_ms=500, tracker=tracker) == 1
+    finally:
+        release.set()
+
+
+def test_saturated_stage_fails_within_its_budget():
+    tracker = LatencyTracker()
+    release = threading.Event()
+    for _ in range(STAGE_POOL_WORKERS):
+        with pytest.raises(BudgetExceeded):
+            hedged_call("saturated", release.wait, budget_ms=20, tracker=tracker)
+    try:
+        start = time.perf_counter()
+        with pytest.raises(BudgetExceeded):
+            hedged_call("saturated", lambda: 1, budget_ms=100, tracker=tracker)
+        assert time.perf_counter() - start < 0.5
+        assert tracker.summary()["saturated"]["saturated"] >= 1
+    finally:
+        release.set()
+
+    # Once the stuck attempts finish, the stage recovers
+    time.sleep(0.1)
+    assert hedged_call("saturated", lambda: 1, budget_ms=500, tracker=tracker) == 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from rag_search.sharding import MAX_SHARD_ATTEMPTS, ShardQueue, embed_shard, load_shard_vectors, shard_of
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ShardQueue.create(str(tmp_path / "faq.shards.sqlite"), {"num_shards": 3, "source": "local"})
+    yield queue
+    queue.close()
+
+
+def test_job_round_trips(queue):
+    assert queue.job() == {"num_shards": 3, "source": "local"}
+    assert queue.counts() == {"pending": 3, "running": 0, "done": 0, "failed": 0}
+
+
+def test_shards_are_claimed_once_in_order(queue):
+    assert [queue.claim("a"), queue.claim("b"), queue.claim("a")] == [0, 1, 2]
+    assert queue.claim("b") is None
+    assert queue.counts()["running"] == 3
+
+
+def test_completed_shards_are_not_claimed_again(queue):
+    shard = queue.claim("a")
+    queue.complete(shard, "a", 10)
+    assert queue.claim("b") == 1
+    assert queue.documents() == 10
+    assert queue.counts()["done"] == 1
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue):
+    assert queue.claim("a", lease_seconds=-1) == 0
+    assert queue.claim("b") == 0
+    # The worker that lost its lease can no longer complete the shard
+    queue.complete(0, "a", 10)
+    assert queue.counts()["done"] == 0
+
+
+def test_renewed_lease_is_kept(queue):
+    assert queue.claim("a", lease_seconds=-1) == 0
+    queue.renew(0, "a")
+    assert queue.claim("b") == 1
+
+
+def test_failed_shard_is_retried_until_out_of_attempts(queue):
+    for attempt in range(MAX_SHARD_ATTEMPTS):
+        assert queue.claim("a") == 0
+        queue.fail(0, "a", f"error {attempt}")
+    assert queue.counts()["failed"] == 1
+    assert queue.errors() == [(0, f"error {MAX_SHARD_ATTEMPTS - 1}")]
+    assert queue.claim("a") == 1
+
+    queue.retry_failed()
+    assert queue.counts()["failed"] == 0
+    assert queue.claim("a") == 0
+
+
+def test_expired_lease_counts_as_an_attempt(queue):
+    for _ in range(MAX_SHARD_ATTEMPTS):
+        assert queue.claim("a", lease_seconds=-1) == 0
+    assert queue.claim("b") == 1
+    assert queue.errors() == [(0, "lease expired on a")]
+
+
+def test_shard_of_ignores_case_and_spacing():
+    assert shard_of("How do I reset my password?", 8) == shard_of("how do i  reset my password?", 8)
+    assert 0 <= shard_of("Anything", 8) < 8
+
+
+def test_shard_vectors_are_loaded_in_row_order(tmp_path, monkeypatch):
+    monkeypatch.setattr("rag_search.sharding.openai_client", lambda: None)
+    monkeypatch.setattr(
+        "rag_search.sharding.embed_texts",
+        lambda client, texts, name: np.array([[float(text)] * 3072 for text in texts], dtype=np.float32),
+    )
+    embed_shard(0, [(0, {"question": "0"}), (2, {"question": "2"})], str(tmp_path))
+    embed_shard(1, [(1, {"question": "1"})], str(tmp_path))
+    store = load_shard_vectors(str(tmp_path), 2, 3)
+    assert store.vectors[:, 0].tolist() == [0.0, 1.0, 2.0]
+
+    with pytest.raises(RuntimeError):
+        load_shard_vectors(str(tmp_path), 2, 4)
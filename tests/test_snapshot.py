@@ -0,0 +1,31 @@
+import types
+from rag_search import snapshot
+
+
+class FakeSearchClient:
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.queries = []
+
+    def search(self, search_text, filter=None, select=None, order_by=None, top=None):
+        self.queries.append(filter)
+        keys = self.keys
+        if filter is not None:
+            last = filter.split(" gt ")[1].strip("'").replace("''", "'")
+            keys = [key for key in keys if key > last]
+        return [{"id": key} for key in keys[:top]]
+
+
+def _index(sortable=True):
+    key = types.SimpleNamespace(name="id", key=True, sortable=sortable, filterable=sortable)
+    return types.SimpleNamespace(fields=[key])
+
+
+def test_documents_are_paged_by_key(monkeypatch):
+    monkeypatch.setattr(snapshot, "EXPORT_PAGE_SIZE", 3)
+    keys = [f"doc-{i:02d}" for i in range(8)] + ["o'brien"]
+    client = FakeSearchClient(keys)
+    exported = [doc["id"] for doc in snapshot.iter_documents(client, _index())]
+    assert exported == sorted(keys)
+    # Every page but the first starts after the previous page's last key
+    assert client.queries == [None, "id gt 'doc-02'", "id gt 'doc-05'", "id gt 'o''brien'"]